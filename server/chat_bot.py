@@ -17,15 +17,26 @@ Workflow:
 from __future__ import annotations
 
 import argparse
+import asyncio
+import base64
 import datetime as dt
+import functools
 import json
+import mimetypes
+import re
 import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import manage_day
+from core import llm_cache
 from integrations import llm_client
 
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover
+    Image = None  # type: ignore
+
 DEFAULT_MODEL = "gpt-5-mini"
 # Ark 默认模型：文本/图文多模态（支持 image_url），按你的示例改为最新 ID
 DEFAULT_ARK_MODEL = "doubao-seed-1-6-flash-250828"
@@ -45,12 +56,19 @@ def _normalize_provider(provider: str) -> str:
     return provider
 
 
-def make_client(provider: str) -> Any:
+def make_client(provider: str, use_async: bool = False) -> Any:
+    if use_async:
+        return llm_client.make_async_client(_normalize_provider(provider))
     return llm_client.make_client(_normalize_provider(provider))
 
 
-def classify_message(client: Any, model: str, user_text: str, goal_text: Optional[str]) -> Dict[str, Any]:
-    """Ask LLM to produce a JSON plan."""
+def _goal_hint(goal_text: Optional[str]) -> str:
+    return f"目标提示: {goal_text[:800]}" if goal_text else "无目标提示"
+
+
+def _classify_messages(
+    user_text: str, goal_text: Optional[str], goal_hint: Optional[str] = None
+) -> List[Dict[str, str]]:
     system_prompt = (
         "你是 LifeMentor，一个温和的生活教练。输出 JSON，不要多余文本。"
         "字段: action: morning|evening|none; text: string|null; "
@@ -62,11 +80,35 @@ def classify_message(client: Any, model: str, user_text: str, goal_text: Optiona
         "无法判断则 action 用 none。"
         "reply 始终要有内容，回复语言与用户输入一致（用户说英文就回英文，说中文就回中文）。"
     )
-    goal_hint = f"目标提示: {goal_text[:800]}" if goal_text else "无目标提示"
-    messages = [
+    if goal_hint is None:
+        goal_hint = _goal_hint(goal_text)
+    return [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": f"{goal_hint}\n用户: {user_text}"},
     ]
+
+
+def _classify_cache_key(model: str, messages: List[Dict[str, str]]) -> str:
+    # temperature=0 + 固定 system prompt，相同输入输出确定，可安全做精确缓存。
+    return llm_cache.make_key(model, *(m["content"] for m in messages))
+
+
+def classify_message(
+    client: Any,
+    model: str,
+    user_text: str,
+    goal_text: Optional[str],
+    goal_hint: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Ask LLM to produce a JSON plan."""
+    messages = _classify_messages(user_text, goal_text, goal_hint)
+    key = _classify_cache_key(model, messages)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return cached
+    cached = llm_cache.semantic_get(model, user_text)
+    if cached is not None:
+        return cached
     resp = client.chat.completions.create(
         model=model,
         messages=messages,
@@ -74,7 +116,41 @@ def classify_message(client: Any, model: str, user_text: str, goal_text: Optiona
         temperature=0,
     )
     content = resp.choices[0].message.content  # type: ignore
-    return json.loads(content)
+    result = json.loads(content)
+    llm_cache.put(key, result)
+    llm_cache.semantic_put(model, user_text, result)
+    return result
+
+
+async def classify_message_async(
+    client: Any,
+    model: str,
+    user_text: str,
+    goal_text: Optional[str],
+    semaphore: Optional[asyncio.Semaphore] = None,
+    goal_hint: Optional[str] = None,
+) -> Dict[str, Any]:
+    """异步版 classify_message；semaphore 用于限制并发请求数。"""
+    messages = _classify_messages(user_text, goal_text, goal_hint)
+    key = _classify_cache_key(model, messages)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return cached
+    cached = llm_cache.semantic_get(model, user_text)
+    if cached is not None:
+        return cached
+    async with semaphore or asyncio.Semaphore(1):
+        resp = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            response_format={"type": "json_object"},
+            temperature=0,
+        )
+    content = resp.choices[0].message.content  # type: ignore
+    result = json.loads(content)
+    llm_cache.put(key, result)
+    llm_cache.semantic_put(model, user_text, result)
+    return result
 
 
 def vision_describe(
@@ -97,10 +173,256 @@ def vision_describe(
     return resp.choices[0].message.content  # type: ignore
 
 
+# 流式输出时从未完结的 JSON 前缀里提取 plan 字段（reply 通常最后生成）
+_PARTIAL_PLAN_RES = {
+    "action": re.compile(r'"action"\s*:\s*("(?:[^"\\]|\\.)*")'),
+    "text": re.compile(r'"text"\s*:\s*(null|"(?:[^"\\]|\\.)*")'),
+    "journal": re.compile(r'"journal"\s*:\s*(null|"(?:[^"\\]|\\.)*")'),
+    "images": re.compile(r'"images"\s*:\s*(\[[^\[\]]*\])'),
+}
+
+
+def _extract_partial_plan(buffer: str) -> Optional[Dict[str, Any]]:
+    """所有 apply_action 需要的字段齐了才返回 plan，否则返回 None。"""
+    plan: Dict[str, Any] = {}
+    for field, pattern in _PARTIAL_PLAN_RES.items():
+        match = pattern.search(buffer)
+        if not match:
+            return None
+        try:
+            plan[field] = json.loads(match.group(1))
+        except Exception:
+            return None
+    return plan
+
+
+async def classify_message_stream_async(
+    client: Any,
+    model: str,
+    user_text: str,
+    goal_text: Optional[str],
+    goal_hint: Optional[str] = None,
+    on_plan: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """流式分类：JSON 前缀一旦包含 action/text/journal/images 就回调 on_plan，
+
+    让磁盘写入与 reply 的剩余生成重叠，降低整体时延。返回值与
+    classify_message_async 相同（完整解析的 JSON）。
+    """
+    messages = _classify_messages(user_text, goal_text, goal_hint)
+    key = _classify_cache_key(model, messages)
+    cached = llm_cache.get(key) or llm_cache.semantic_get(model, user_text)
+    if cached is not None:
+        if on_plan is not None:
+            on_plan(cached)
+        return cached
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=messages,
+        response_format={"type": "json_object"},
+        temperature=0,
+        stream=True,
+    )
+    buffer = ""
+    plan_sent = False
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content or ""
+        if not delta:
+            continue
+        buffer += delta
+        if on_plan is not None and not plan_sent:
+            plan = _extract_partial_plan(buffer)
+            if plan is not None:
+                plan_sent = True
+                on_plan(plan)
+    result = json.loads(buffer)
+    llm_cache.put(key, result)
+    llm_cache.semantic_put(model, user_text, result)
+    return result
+
+
+class ClassifierQueue:
+    """服务器模式下的分类合批队列。
+
+    多个并发用户消息先进入 asyncio.Queue，worker 在 batch_window_ms 内
+    最多收集 batch_size 条，然后用 asyncio.gather 一次性并发提交，
+    吞吐量接近单条延迟而不是逐条串行。
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        model: str,
+        batch_size: int = 16,
+        batch_window_ms: int = 100,
+        max_concurrency: int = 8,
+    ) -> None:
+        self._client = client
+        self._model = model
+        self._batch_size = batch_size
+        self._batch_window = batch_window_ms / 1000.0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker_task: Optional[asyncio.Task] = None
+
+    async def classify(
+        self, user_text: str, goal_text: Optional[str] = None, goal_hint: Optional[str] = None
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        await self._queue.put((user_text, goal_text, goal_hint, future))
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = asyncio.create_task(self._worker())
+        return await future
+
+    async def _collect_batch(self) -> List[tuple]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._batch_window
+        while len(batch) < self._batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            results = await asyncio.gather(
+                *(
+                    classify_message_async(
+                        self._client,
+                        self._model,
+                        user_text,
+                        goal_text,
+                        semaphore=self._semaphore,
+                        goal_hint=goal_hint,
+                    )
+                    for user_text, goal_text, goal_hint, _ in batch
+                ),
+                return_exceptions=True,
+            )
+            for (_, _, _, future), result in zip(batch, results):
+                if future.cancelled():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+            if self._queue.empty():
+                return
+
+
+async def vision_describe_async(
+    client: Any,
+    model: str,
+    image_url: str,
+    prompt: str,
+    reasoning_effort: str = "medium",
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> str:
+    """异步版 vision_describe，可与其他调用 asyncio.gather 并发。"""
+    async with semaphore or asyncio.Semaphore(1):
+        resp = await client.chat.completions.create(
+            model=model,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "image_url", "image_url": {"url": image_url}},
+                        {"type": "text", "text": prompt},
+                    ],
+                }
+            ],
+            reasoning_effort=reasoning_effort,
+        )
+    return resp.choices[0].message.content  # type: ignore
+
+
+VISION_MAX_EDGE = 1280  # 长边超过这个值时先缩小，减少上传字节与模型预处理时间
+
+
+def _prepare_image(data: bytes, max_long: int = VISION_MAX_EDGE, quality: int = 85) -> Optional[str]:
+    """长边超限或大 PNG 时缩放/转码成 JPEG，返回 base64；无需处理返回 None。
+
+    上传字节与服务端预处理时间都随像素数涨，Lanczos 缩到 max_long 内
+    对描述类任务几乎无损。Pillow 缺失或解码失败时返回 None 走原图。
+    """
+    if Image is None:
+        return None
+    try:
+        from io import BytesIO
+
+        img = Image.open(BytesIO(data))
+        needs_transcode = img.format == "PNG" and img.size[0] * img.size[1] > 512 * 512
+        if max(img.size) <= max_long and not needs_transcode:
+            return None
+        resample = getattr(Image, "LANCZOS", None) or Image.Resampling.LANCZOS
+        img.thumbnail((max_long, max_long), resample)
+        buf = BytesIO()
+        img.convert("RGB").save(buf, "JPEG", quality=quality, optimize=True)
+        return base64.b64encode(buf.getvalue()).decode("ascii")
+    except Exception:
+        return None
+
+
+def _maybe_downscale_url(url: str) -> str:
+    """data URL 且解码成功时替换为缩放后的 JPEG data URL；其余原样返回。"""
+    if not url.startswith("data:"):
+        return url
+    try:
+        b64 = url.split(",", 1)[1]
+        prepared = _prepare_image(base64.b64decode(b64))
+    except Exception:
+        return url
+    if prepared is None:
+        return url
+    return f"data:image/jpeg;base64,{prepared}"
+
+
+def _encode_image_for_vision(path: Path) -> str:
+    """读取本地图片并编码为 data URL。
+
+    大尺寸 PNG 先转成 JPEG（quality 90）：PNG 编码比 JPEG 慢一个量级，
+    体积也更大。Pillow 不可用时直接按原始字节 base64。
+    """
+    data = path.read_bytes()
+    prepared = _prepare_image(data, quality=90)
+    if prepared is not None:
+        return f"data:image/jpeg;base64,{prepared}"
+    mime = mimetypes.guess_type(str(path))[0] or "image/jpeg"
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def vision_describe_path(
+    client: Any, model: str, image_path: Path, prompt: str, reasoning_effort: str = "medium"
+) -> str:
+    """Describe a local image file, transcoding/downscaling before upload."""
+    return vision_describe(client, model, _encode_image_for_vision(image_path), prompt, reasoning_effort)
+
+
 def vision_describe_base64(
-    client: Any, model: str, image_b64: str, prompt: str, reasoning_effort: str = "medium"
+    client: Any,
+    model: str,
+    image_b64: str,
+    prompt: str,
+    reasoning_effort: str = "medium",
+    downscale: bool = False,
 ) -> str:
     """Use a vision model with a base64 data URL."""
+    if downscale:
+        try:
+            prepared = _prepare_image(base64.b64decode(image_b64))
+        except Exception:
+            prepared = None
+        if prepared is not None:
+            image_b64 = prepared
     data_url = f"data:image/jpeg;base64,{image_b64}"
     resp = client.chat.completions.create(
         model=model,
@@ -118,30 +440,81 @@ def vision_describe_base64(
     return resp.choices[0].message.content  # type: ignore
 
 
+def _vision_content(image_urls: List[str], prompt: str) -> List[Dict[str, Any]]:
+    content: List[Dict[str, Any]] = [
+        {"type": "image_url", "image_url": {"url": url}} for url in image_urls
+    ]
+    content.append({"type": "text", "text": prompt})
+    return content
+
+
 def vision_describe_multi(
-    client: Any, model: str, image_urls: List[str], prompt: str, reasoning_effort: str = "medium"
+    client: Any,
+    model: str,
+    image_urls: List[str],
+    prompt: str,
+    reasoning_effort: str = "medium",
+    downscale: bool = False,
 ) -> str:
     """Use a vision model with multiple image URLs or data URLs."""
-    content = [{"type": "image_url", "image_url": {"url": url}} for url in image_urls]
-    content.append({"type": "text", "text": prompt})
+    if downscale:
+        image_urls = [_maybe_downscale_url(url) for url in image_urls]
     resp = client.chat.completions.create(
         model=model,
-        messages=[{"role": "user", "content": content}],
+        messages=[{"role": "user", "content": _vision_content(image_urls, prompt)}],
         reasoning_effort=reasoning_effort,
     )
     return resp.choices[0].message.content  # type: ignore
 
 
+async def vision_describe_multi_async(
+    client: Any,
+    model: str,
+    image_urls: List[str],
+    prompt: str,
+    reasoning_effort: str = "medium",
+    stagger_seconds: float = 0.05,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> str:
+    """每张图一个并发请求（错峰启动），总耗时从 Σ(latency) 降到 ~max(latency)。
+
+    单请求多图会让服务端串行解码所有图片；拆成 N 个请求后各阶段可以
+    流水线并行。stagger_seconds 用于错开图片编码高峰。
+    """
+    semaphore = semaphore or asyncio.Semaphore(len(image_urls))
+    tasks: List[asyncio.Task] = []
+    for url in image_urls:
+        tasks.append(
+            asyncio.create_task(
+                vision_describe_async(
+                    client, model, url, prompt, reasoning_effort, semaphore=semaphore
+                )
+            )
+        )
+        if stagger_seconds > 0:
+            await asyncio.sleep(stagger_seconds)
+    results = await asyncio.gather(*tasks)
+    if len(results) == 1:
+        return results[0]
+    return "\n\n".join(f"[图片 {i + 1}] {text}" for i, text in enumerate(results))
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_daily_file(date_iso: str) -> Path:
+    """同一日期的日记路径在一个会话里只解析/创建一次（交互模式每轮都会用到）。"""
+    return manage_day.ensure_daily_file(dt.date.fromisoformat(date_iso))
+
+
 def apply_action(
     action: str,
     date: dt.date,
     goal_text: Optional[str],
     text_input: Optional[str],
     journal: Optional[str],
-    images: List[str],
+    images: List[Any],
 ) -> Path:
-    daily_path = manage_day.ensure_daily_file(date)
-    img_paths = [Path(p) for p in images]
+    daily_path = _cached_daily_file(date.isoformat())
+    img_paths = [p if isinstance(p, Path) else Path(p) for p in images]
     if action == "morning":
         manage_day.run_morning(daily_path, goal_text, img_paths, text_input=text_input)
     elif action == "evening":
@@ -149,6 +522,91 @@ def apply_action(
     return daily_path
 
 
+async def handle_single_turn_async(args: argparse.Namespace) -> None:
+    """单轮异步路径：分类与视觉调用 asyncio.gather 并发，减少串行网络等待。"""
+    client = make_client(args.provider, use_async=True)
+    goal_text = read_goal_text(args.goal_file)
+    semaphore = asyncio.Semaphore(args.max_concurrency)
+
+    early_apply: Dict[str, Any] = {}
+
+    def _on_plan(plan: Dict[str, Any]) -> None:
+        # 字段齐了就先把磁盘写入丢进线程池，与 reply 的剩余流式生成并行
+        early_apply["task"] = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(
+                apply_action,
+                plan.get("action", "none"),
+                args.date,
+                goal_text,
+                plan.get("text"),
+                plan.get("journal"),
+                plan.get("images", []) or [],
+            )
+        )
+
+    if args.stream:
+        classify_task: Any = classify_message_stream_async(
+            client, args.model, args.message, goal_text, on_plan=_on_plan
+        )
+    else:
+        classify_task = classify_message_async(
+            client, args.model, args.message, goal_text, semaphore=semaphore
+        )
+    tasks: List[Any] = [classify_task]
+    if args.vision_url:
+        vision_urls = [u.strip() for u in args.vision_url.split(",") if u.strip()]
+        if args.vision_downscale:
+            vision_urls = [_maybe_downscale_url(url) for url in vision_urls]
+        if len(vision_urls) > 1 and args.multi_batched:
+            # 旧路径：所有图片打包进一个请求
+            async def _batched() -> str:
+                async with semaphore:
+                    resp = await client.chat.completions.create(
+                        model=args.vision_model,
+                        messages=[
+                            {"role": "user", "content": _vision_content(vision_urls, args.vision_prompt)}
+                        ],
+                    )
+                return resp.choices[0].message.content  # type: ignore
+
+            tasks.append(_batched())
+        elif len(vision_urls) > 1:
+            tasks.append(
+                vision_describe_multi_async(
+                    client, args.vision_model, vision_urls, args.vision_prompt, semaphore=semaphore
+                )
+            )
+        else:
+            tasks.append(
+                vision_describe_async(
+                    client, args.vision_model, vision_urls[0], args.vision_prompt, semaphore=semaphore
+                )
+            )
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    result = results[0]
+    if isinstance(result, BaseException):
+        raise result
+    action = result.get("action", "none")
+    images = result.get("images", []) or []
+    text_input = result.get("text")
+    journal = result.get("journal")
+
+    if early_apply.get("task") is not None:
+        path = await early_apply["task"]
+    else:
+        path = apply_action(action, args.date, goal_text, text_input, journal, images)
+    output = {"action": action, "file": str(path), "parsed": result}
+    if args.vision_url:
+        vision_result = results[1]
+        if isinstance(vision_result, BaseException):
+            output["vision_error"] = str(vision_result)
+        else:
+            output["vision"] = vision_result
+
+    print(json.dumps(output, ensure_ascii=False, indent=2))
+
+
 def handle_single_turn(args: argparse.Namespace) -> None:
     client = make_client(args.provider)
     goal_text = read_goal_text(args.goal_file)
@@ -164,7 +622,10 @@ def handle_single_turn(args: argparse.Namespace) -> None:
     # Optional vision call if user supplied --vision-url
     if args.vision_url:
         try:
-            vision_text = vision_describe(client, args.vision_model, args.vision_url, args.vision_prompt)
+            vision_url = (
+                _maybe_downscale_url(args.vision_url) if args.vision_downscale else args.vision_url
+            )
+            vision_text = vision_describe(client, args.vision_model, vision_url, args.vision_prompt)
             output["vision"] = vision_text
         except Exception as exc:  # pragma: no cover - network errors
             output["vision_error"] = str(exc)
@@ -175,12 +636,23 @@ def handle_single_turn(args: argparse.Namespace) -> None:
 def handle_interactive(args: argparse.Namespace) -> None:
     client = make_client(args.provider)
     goal_text = read_goal_text(args.goal_file)
+    goal_hint = _goal_hint(goal_text)
+    goal_mtime = (
+        args.goal_file.stat().st_mtime_ns if args.goal_file and args.goal_file.exists() else None
+    )
     print("进入对话模式，输入 'exit' 退出。")
     while True:
         user_text = input("> ").strip()
         if user_text.lower() in {"exit", "quit"}:
             break
-        result = classify_message(client, args.model, user_text, goal_text)
+        # 长时间 REPL 中目标文件可能被编辑：mtime 变了才重读，平时复用缓存 hint
+        if args.goal_file and args.goal_file.exists():
+            mtime = args.goal_file.stat().st_mtime_ns
+            if mtime != goal_mtime:
+                goal_mtime = mtime
+                goal_text = read_goal_text(args.goal_file)
+                goal_hint = _goal_hint(goal_text)
+        result = classify_message(client, args.model, user_text, goal_text, goal_hint=goal_hint)
         action = result.get("action", "none")
         images = result.get("images", []) or []
         text_input = result.get("text")
@@ -202,9 +674,22 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
         help="选择 API 提供方",
     )
     parser.add_argument("--model", type=str, help="聊天模型名称（默认 openai:gpt-5-mini / ark:doubao-pro-1.5）")
-    parser.add_argument("--vision-url", type=str, help="可选：图片 URL，调用视觉模型描述")
+    parser.add_argument("--vision-url", type=str, help="可选：图片 URL（逗号分隔可传多张），调用视觉模型描述")
+    parser.add_argument(
+        "--vision-downscale",
+        action="store_true",
+        help="发送前把 data URL 图片长边缩到 1280 以内并转 JPEG，省上传与预处理",
+    )
+    parser.add_argument(
+        "--multi-batched",
+        action="store_true",
+        help="--async 多图时仍打包成单个请求（默认拆成并发单图请求）",
+    )
     parser.add_argument("--vision-prompt", type=str, default="请简要描述图片关键信息", help="视觉模型提示语")
     parser.add_argument("--vision-model", type=str, default=DEFAULT_VISION_MODEL, help="视觉模型名称（默认 Ark 示例）")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="单轮模式下并发调用分类与视觉模型")
+    parser.add_argument("--stream", action="store_true", help="--async 模式下流式接收分类结果，提前写入日记")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="--async 模式的最大并发请求数")
     return parser.parse_args(argv)
 
 
@@ -213,7 +698,10 @@ def main(argv: List[str]) -> int:
     if not args.model:
         args.model = DEFAULT_ARK_MODEL if args.provider in {"ark", "doubao"} else DEFAULT_MODEL
     if args.message:
-        handle_single_turn(args)
+        if args.use_async:
+            asyncio.run(handle_single_turn_async(args))
+        else:
+            handle_single_turn(args)
     else:
         handle_interactive(args)
     return 0
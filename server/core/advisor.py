@@ -1,11 +1,22 @@
 from __future__ import annotations
 
 import datetime as dt
+import operator
+import re
 from typing import Any, Dict, List, Optional
 
 
 DONE_STATUSES = {"done", "completed", "finish", "finished"}
 
+# (config key, default)，顺序即 _current_thresholds 返回顺序
+_THRESHOLD_KEYS = (
+    ("advice_sleep_low_minutes", 360),
+    ("advice_sleep_medium_minutes", 420),
+    ("advice_stress_high", 60),
+    ("advice_screen_high_minutes", 240),
+    ("advice_hrv_low_ms", 30),
+)
+
 
 def _get_cfg_int(name: str, default: int) -> int:
     try:
@@ -20,6 +31,44 @@ def _get_cfg_int(name: str, default: int) -> int:
         return default
 
 
+# 趋势规则表：(指标字段, 比较符, 阈值或阈值名, 建议模板)
+# 阈值名在运行时解析到配置阈值，数字为固定阈值。
+_TREND_RULES = (
+    ("sleep_minutes_avg", "<", "sleep_medium", "近{d}天平均睡眠偏低，注意恢复"),
+    ("sleep_minutes_delta", "<", -30, "近{d}天睡眠下降，尝试早点休息"),
+    ("screen_minutes_avg", ">", "screen_high", "近{d}天屏幕时间偏高，减少刷屏"),
+    ("screen_minutes_delta", ">", 30, "近{d}天屏幕时间上升，设定上限"),
+    ("stress_level_avg", ">=", "stress_high", "近{d}天压力偏高，安排放松时段"),
+    ("hrv_ms_avg", "<", "hrv_low", "近{d}天 HRV 偏低，避免高强度"),
+)
+
+_OPS = {"<": operator.lt, ">": operator.gt, ">=": operator.ge}
+
+_FATIGUE_RE = re.compile("[累疲困倦]")
+_ANXIETY_RE = re.compile("焦虑|压力|烦|紧张")
+
+
+# (config 对象, 阈值元组)；持有配置的强引用，用 is 判断失效，
+# 避免旧 config 被回收后 id 复用导致缓存误命中
+_THRESHOLD_CACHE: Optional[tuple] = None
+
+
+def _current_thresholds() -> tuple:
+    global _THRESHOLD_CACHE
+    try:
+        from integrations.config import get_config
+
+        cfg = get_config()
+    except Exception:
+        cfg = None
+    cached = _THRESHOLD_CACHE
+    if cached is not None and cached[0] is cfg:
+        return cached[1]
+    thresholds = tuple(_get_cfg_int(name, default) for name, default in _THRESHOLD_KEYS)
+    _THRESHOLD_CACHE = (cfg, thresholds)
+    return thresholds
+
+
 def _parse_date(date_str: Optional[str]) -> Optional[dt.date]:
     if not date_str:
         return None
@@ -67,8 +116,9 @@ def generate_daily_actions(graph: Dict[str, Any], limit: int = 3) -> List[str]:
     return suggestions
 
 
-def _add_unique(suggestions: List[str], text: str) -> None:
-    if text not in suggestions:
+def _add_unique(suggestions: List[str], seen: set, text: str) -> None:
+    if text not in seen:
+        seen.add(text)
         suggestions.append(text)
 
 
@@ -79,11 +129,8 @@ def generate_daily_advice(
     trends: Optional[List[Dict[str, Any]]] = None,
 ) -> List[str]:
     suggestions: List[str] = []
-    sleep_low = _get_cfg_int("advice_sleep_low_minutes", 360)
-    sleep_medium = _get_cfg_int("advice_sleep_medium_minutes", 420)
-    stress_high = _get_cfg_int("advice_stress_high", 60)
-    screen_high = _get_cfg_int("advice_screen_high_minutes", 240)
-    hrv_low = _get_cfg_int("advice_hrv_low_ms", 30)
+    seen: set = set()
+    sleep_low, sleep_medium, stress_high, screen_high, hrv_low = _current_thresholds()
 
     normalized = (state or {}).get("normalized") or {}
     sleep = normalized.get("sleep") or {}
@@ -96,51 +143,43 @@ def generate_daily_advice(
 
     if sleep_minutes is not None:
         if sleep_minutes < sleep_low:
-            _add_unique(suggestions, "今天优先恢复，降低任务强度并早点休息")
+            _add_unique(suggestions, seen, "今天优先恢复，降低任务强度并早点休息")
         elif sleep_minutes < sleep_medium:
-            _add_unique(suggestions, "安排低强度任务，留出休息间隙")
+            _add_unique(suggestions, seen, "安排低强度任务，留出休息间隙")
 
     if stress_level is not None and stress_level >= stress_high:
-        _add_unique(suggestions, "安排 5 分钟安静呼吸，降低压力")
+        _add_unique(suggestions, seen, "安排 5 分钟安静呼吸，降低压力")
 
     if screen_minutes is not None and screen_minutes >= screen_high:
-        _add_unique(suggestions, "减少屏幕时间，给眼睛和注意力放松")
+        _add_unique(suggestions, seen, "减少屏幕时间，给眼睛和注意力放松")
 
     if hrv_ms is not None and hrv_ms < hrv_low:
-        _add_unique(suggestions, "今天多做恢复型活动，避免高强度刺激")
+        _add_unique(suggestions, seen, "今天多做恢复型活动，避免高强度刺激")
 
     if trends:
+        named_thresholds = {
+            "sleep_medium": sleep_medium,
+            "screen_high": screen_high,
+            "stress_high": stress_high,
+            "hrv_low": hrv_low,
+        }
         for trend in trends:
             if trend.get("count", 0) == 0:
                 continue
-            sleep_avg = trend.get("sleep_minutes_avg")
-            sleep_delta = trend.get("sleep_minutes_delta")
-            if sleep_avg is not None and sleep_avg < sleep_medium:
-                _add_unique(suggestions, f"近{trend['window_days']}天平均睡眠偏低，注意恢复")
-            if sleep_delta is not None and sleep_delta < -30:
-                _add_unique(suggestions, f"近{trend['window_days']}天睡眠下降，尝试早点休息")
-
-            screen_avg = trend.get("screen_minutes_avg")
-            screen_delta = trend.get("screen_minutes_delta")
-            if screen_avg is not None and screen_avg > screen_high:
-                _add_unique(suggestions, f"近{trend['window_days']}天屏幕时间偏高，减少刷屏")
-            if screen_delta is not None and screen_delta > 30:
-                _add_unique(suggestions, f"近{trend['window_days']}天屏幕时间上升，设定上限")
-
-            stress_avg = trend.get("stress_level_avg")
-            if stress_avg is not None and stress_avg >= stress_high:
-                _add_unique(suggestions, f"近{trend['window_days']}天压力偏高，安排放松时段")
-
-            hrv_avg = trend.get("hrv_ms_avg")
-            if hrv_avg is not None and hrv_avg < hrv_low:
-                _add_unique(suggestions, f"近{trend['window_days']}天 HRV 偏低，避免高强度")
+            for field, op, threshold, template in _TREND_RULES:
+                value = trend.get(field)
+                if value is None:
+                    continue
+                bound = named_thresholds[threshold] if isinstance(threshold, str) else threshold
+                if _OPS[op](value, bound):
+                    _add_unique(suggestions, seen, template.format(d=trend["window_days"]))
 
     text = (recent_state or "").strip()
     if text:
-        if any(word in text for word in ["累", "疲", "困", "倦"]):
-            _add_unique(suggestions, "安排一次轻度恢复：散步/拉伸/热水澡")
-        if any(word in text for word in ["焦虑", "压力", "烦", "紧张"]):
-            _add_unique(suggestions, "给自己 5 分钟安静呼吸，降低压力")
+        if _FATIGUE_RE.search(text):
+            _add_unique(suggestions, seen, "安排一次轻度恢复：散步/拉伸/热水澡")
+        if _ANXIETY_RE.search(text):
+            _add_unique(suggestions, seen, "给自己 5 分钟安静呼吸，降低压力")
 
     if not suggestions:
         suggestions.append("多笑笑，给自己一点轻松感")
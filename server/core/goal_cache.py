@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from integrations.config import get_config
+
+from core import goal_manager
+
+
+def load_or_build() -> Dict[str, Any]:
+    """命中 mtime 指纹缓存时直接返回图，未命中才重建并落盘。
+
+    build_goal_graph 内部已有同一份磁盘缓存，但调试脚本的惯用写法
+    `build_goal_graph(); save_goal_graph(graph)` 即使命中也会把缓存和
+    .sig 原样重写一遍。这里把"读缓存"与"重建后写缓存"拆开：反复跑
+    debug_morning_prompt / preview_weekly_plan 时源目录没变就零写入。
+    """
+    cfg = get_config()
+    cache_path = goal_manager._graph_cache_path(cfg)
+    if cache_path is not None and cache_path.exists():
+        sig_path = cache_path.with_suffix(".sig")
+        try:
+            if sig_path.read_text(encoding="utf-8").strip() == goal_manager._graph_signature(cfg):
+                return goal_manager._loads_graph(cache_path.read_bytes())
+        except Exception:
+            pass
+    graph = goal_manager.build_goal_graph()
+    goal_manager.save_goal_graph(graph)
+    return graph
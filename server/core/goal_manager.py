@@ -3,21 +3,56 @@ from __future__ import annotations
 import datetime as dt
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from integrations.config import get_config
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import yaml  # type: ignore
+
+    _YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+except ImportError:  # pragma: no cover
+    yaml = None  # type: ignore
+    _YAML_LOADER = None
+
 INDEX_FILES = {"Values.md", "Goals.md", "Projects.md"}
 
+FRONTMATTER_RE = re.compile(r"^---\n(.*?)\n---", re.DOTALL)
+
 
 def _read_text(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
 def _parse_frontmatter(text: str) -> Dict[str, Any]:
+    """正则截取 YAML 块 + C 版 SafeLoader 解析；失败时退回逐行解析。"""
     if not text.startswith("---"):
         return {}
+    if yaml is not None:
+        match = FRONTMATTER_RE.match(text)
+        if not match:
+            return {}
+        try:
+            parsed = yaml.load(match.group(1), Loader=_YAML_LOADER)
+        except Exception:
+            return _parse_frontmatter_simple(text)
+        if not isinstance(parsed, dict):
+            return _parse_frontmatter_simple(text)
+        data = {str(k).lower(): v for k, v in parsed.items()}
+        if "tags" not in data and "tag" in data:
+            data["tags"] = data["tag"]
+        return data
+    return _parse_frontmatter_simple(text)
+
+
+def _parse_frontmatter_simple(text: str) -> Dict[str, Any]:
     parts = text.split("---", 2)
     if len(parts) < 3:
         return {}
@@ -43,6 +78,8 @@ def _parse_frontmatter(text: str) -> Dict[str, Any]:
 
 
 INLINE_FIELD_RE = re.compile(r"\[([A-Za-z]+)\s*::\s*([^\]]+)\]")
+LINK_RE = re.compile(r"\[\[([^\]|]+)")
+DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
 
 
 def _parse_inline_fields(text: str) -> Dict[str, str]:
@@ -66,7 +103,7 @@ def _extract_title(text: str, fallback: str) -> str:
 def _extract_link(value: Optional[str]) -> Optional[str]:
     if not value:
         return value
-    match = re.search(r"\[\[([^\]|]+)", value)
+    match = LINK_RE.search(value)
     if match:
         return match.group(1).strip()
     return value.strip()
@@ -75,7 +112,7 @@ def _extract_link(value: Optional[str]) -> Optional[str]:
 def _extract_date(value: Optional[str]) -> Optional[str]:
     if not value:
         return None
-    match = re.search(r"(\\d{4}-\\d{2}-\\d{2})", value)
+    match = DATE_RE.search(value)
     return match.group(1) if match else None
 
 
@@ -95,69 +132,95 @@ def _load_markdown(dir_path: Path) -> List[Path]:
     return sorted([p for p in dir_path.glob("*.md") if p.name not in INDEX_FILES])
 
 
-def load_values(dir_path: Path) -> List[Dict[str, Any]]:
-    items = []
-    for path in _load_markdown(dir_path):
-        text = _read_text(path)
+def _parse_md(text: str, fallback_title: str) -> tuple:
+    """一次遍历取出 (frontmatter, inline_fields, title)。
+
+    frontmatter 只解析一次并记住其结束位置，inline 字段和标题只扫描
+    正文部分，避免对同一份文本做三轮全文扫描。
+    """
+    frontmatter: Dict[str, Any] = {}
+    body = text
+    if text.startswith("---"):
         frontmatter = _parse_frontmatter(text)
-        tags = _as_list(frontmatter.get("tags"))
-        if tags and "value" not in tags:
-            continue
-        inline = _parse_inline_fields(text)
-        items.append(
-            {
-                "id": path.stem,
-                "name": _extract_title(text, path.stem),
-                "why": inline.get("why"),
-            }
-        )
-    return items
+        match = FRONTMATTER_RE.match(text)
+        if match:
+            body = text[match.end() :]
+    inline = {key.lower(): value.strip() for key, value in INLINE_FIELD_RE.findall(body)}
+    title = _extract_title(body, fallback_title)
+    return frontmatter, inline, title
+
+
+def _item_from_text(kind: str, path: Path, text: str) -> Optional[Dict[str, Any]]:
+    """按类别解析单个 markdown 文件；tag 与类别不符时返回 None。"""
+    frontmatter, inline, title = _parse_md(text, path.stem)
+    tags = _as_list(frontmatter.get("tags"))
+    if tags and kind not in tags:
+        return None
+    if kind == "value":
+        return {
+            "id": path.stem,
+            "name": title,
+            "why": inline.get("why"),
+        }
+    if kind == "goal":
+        return {
+            "id": path.stem,
+            "name": title,
+            "status": frontmatter.get("status"),
+            "why": inline.get("why"),
+            "value": _extract_link(inline.get("value")),
+            "deadline": _extract_date(inline.get("deadline")),
+        }
+    return {
+        "id": path.stem,
+        "name": title,
+        "status": frontmatter.get("status"),
+        "goal": _extract_link(inline.get("goal")),
+        "target": inline.get("target"),
+        "deadline": _extract_date(inline.get("deadline")),
+    }
 
 
-def load_goals(dir_path: Path) -> List[Dict[str, Any]]:
+def _load_items(kind: str, dir_path: Path) -> List[Dict[str, Any]]:
     items = []
     for path in _load_markdown(dir_path):
-        text = _read_text(path)
-        frontmatter = _parse_frontmatter(text)
-        tags = _as_list(frontmatter.get("tags"))
-        if tags and "goal" not in tags:
-            continue
-        inline = _parse_inline_fields(text)
-        value_name = _extract_link(inline.get("value"))
-        items.append(
-            {
-                "id": path.stem,
-                "name": _extract_title(text, path.stem),
-                "status": frontmatter.get("status"),
-                "why": inline.get("why"),
-                "value": value_name,
-                "deadline": _extract_date(inline.get("deadline")),
-            }
-        )
+        item = _item_from_text(kind, path, _read_text(path))
+        if item is not None:
+            items.append(item)
     return items
 
 
+def load_values(dir_path: Path) -> List[Dict[str, Any]]:
+    return _load_items("value", dir_path)
+
+
+def load_goals(dir_path: Path) -> List[Dict[str, Any]]:
+    return _load_items("goal", dir_path)
+
+
 def load_projects(dir_path: Path) -> List[Dict[str, Any]]:
-    items = []
-    for path in _load_markdown(dir_path):
-        text = _read_text(path)
-        frontmatter = _parse_frontmatter(text)
-        tags = _as_list(frontmatter.get("tags"))
-        if tags and "project" not in tags:
-            continue
-        inline = _parse_inline_fields(text)
-        goal_name = _extract_link(inline.get("goal"))
-        items.append(
-            {
-                "id": path.stem,
-                "name": _extract_title(text, path.stem),
-                "status": frontmatter.get("status"),
-                "goal": goal_name,
-                "target": inline.get("target"),
-                "deadline": _extract_date(inline.get("deadline")),
-            }
-        )
-    return items
+    return _load_items("project", dir_path)
+
+
+def _load_all(
+    values_dir: Path, goals_dir: Path, projects_dir: Path
+) -> Dict[str, List[Dict[str, Any]]]:
+    """一次收集三个目录的文件并用线程池并行读取，隐藏磁盘延迟。"""
+    entries = [
+        (kind, path)
+        for kind, dir_path in (("value", values_dir), ("goal", goals_dir), ("project", projects_dir))
+        for path in _load_markdown(dir_path)
+    ]
+    result: Dict[str, List[Dict[str, Any]]] = {"value": [], "goal": [], "project": []}
+    if not entries:
+        return result
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        texts = list(executor.map(lambda e: _read_text(e[1]), entries))
+    for (kind, path), text in zip(entries, texts):
+        item = _item_from_text(kind, path, text)
+        if item is not None:
+            result[kind].append(item)
+    return result
 
 
 def _parse_date(date_str: Optional[str]) -> Optional[dt.date]:
@@ -169,14 +232,52 @@ def _parse_date(date_str: Optional[str]) -> Optional[dt.date]:
         return None
 
 
+def _dir_signature(dir_path: Path) -> str:
+    """目录指纹：文件数 + 最大 mtime，任一 .md 变化即失效。"""
+    if not dir_path.exists():
+        return "0:0"
+    files = list(dir_path.glob("*.md"))
+    if not files:
+        return "0:0"
+    return f"{len(files)}:{max(p.stat().st_mtime_ns for p in files)}"
+
+
+def _graph_cache_path(cfg: Dict[str, Any]) -> Optional[Path]:
+    cache_root = Path(str(cfg.get("cache_root", ""))).expanduser()
+    if not str(cache_root) or str(cache_root) == ".":
+        return None
+    return cache_root / "goal_graph.json"
+
+
+def _graph_signature(cfg: Dict[str, Any]) -> str:
+    dirs = [
+        Path(str(cfg.get(key, ""))).expanduser()
+        for key in ("values_dir", "goals_dir", "projects_dir")
+    ]
+    return "|".join(_dir_signature(d) for d in dirs)
+
+
 def build_goal_graph() -> Dict[str, Any]:
     cfg = get_config()
     values_dir = Path(str(cfg.get("values_dir", ""))).expanduser()
     goals_dir = Path(str(cfg.get("goals_dir", ""))).expanduser()
     projects_dir = Path(str(cfg.get("projects_dir", ""))).expanduser()
-    values = load_values(values_dir)
-    goals = load_goals(goals_dir)
-    projects = load_projects(projects_dir)
+
+    # 源目录没变时直接复用磁盘缓存，跳过整轮文件读取 + frontmatter 解析。
+    cache_path = _graph_cache_path(cfg)
+    signature = _graph_signature(cfg)
+    if cache_path is not None and cache_path.exists():
+        sig_path = cache_path.with_suffix(".sig")
+        try:
+            if sig_path.read_text(encoding="utf-8").strip() == signature:
+                return _loads_graph(cache_path.read_bytes())
+        except Exception:
+            pass
+
+    loaded = _load_all(values_dir, goals_dir, projects_dir)
+    values = loaded["value"]
+    goals = loaded["goal"]
+    projects = loaded["project"]
 
     value_map = {v["name"]: {**v, "goals": []} for v in values}
     goal_map: Dict[str, Dict[str, Any]] = {}
@@ -201,11 +302,28 @@ def build_goal_graph() -> Dict[str, Any]:
     return graph
 
 
+def _dumps_graph(graph: Dict[str, Any]) -> bytes:
+    # orjson 原生 UTF-8 且不做 \uXXXX 转义；缺省时退回 stdlib（同样不转义中文）。
+    if orjson is not None:
+        return orjson.dumps(graph, option=orjson.OPT_INDENT_2)
+    return json.dumps(graph, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _loads_graph(data: bytes) -> Dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
 def save_goal_graph(graph: Dict[str, Any], cache_path: Optional[Path] = None) -> Path:
     cfg = get_config()
     if cache_path is None:
         cache_root = Path(str(cfg.get("cache_root", ""))).expanduser()
         cache_path = cache_root / "goal_graph.json"
     cache_path.parent.mkdir(parents=True, exist_ok=True)
-    cache_path.write_text(json.dumps(graph, ensure_ascii=True, indent=2), encoding="utf-8")
+    cache_path.write_bytes(_dumps_graph(graph))
+    try:
+        cache_path.with_suffix(".sig").write_text(_graph_signature(cfg), encoding="utf-8")
+    except Exception:
+        pass
     return cache_path
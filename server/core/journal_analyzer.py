@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import ahocorasick  # type: ignore
+except ImportError:  # pragma: no cover
+    ahocorasick = None  # type: ignore
 
 
 MOOD_KEYWORDS = {
@@ -27,6 +32,27 @@ def _summarize(text: str, max_len: int = 120) -> str:
     return cleaned[:max_len].rstrip() + "..."
 
 
+def _build_keyword_automaton():
+    """把 mood/topic 关键词合并成一个 Aho-Corasick 自动机，单趟扫描出全部命中。"""
+    if ahocorasick is None:
+        return None
+    labels: Dict[str, List[Tuple[str, str]]] = {}
+    for mood, keywords in MOOD_KEYWORDS.items():
+        for kw in keywords:
+            labels.setdefault(kw, []).append(("mood", mood))
+    for topic, keywords in TOPIC_KEYWORDS.items():
+        for kw in keywords:
+            labels.setdefault(kw, []).append(("topic", topic))
+    automaton = ahocorasick.Automaton()
+    for kw, hits in labels.items():
+        automaton.add_word(kw, hits)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+
 def _detect_mood(text: str) -> Optional[str]:
     for mood, keywords in MOOD_KEYWORDS.items():
         if any(k in text for k in keywords):
@@ -42,7 +68,55 @@ def _detect_topics(text: str) -> List[str]:
     return topics
 
 
-def _detect_linked_projects(text: str, projects: List[Dict[str, Any]]) -> List[str]:
+def _scan_keywords(text: str) -> Tuple[Optional[str], List[str]]:
+    """单趟扫描文本，返回 (mood, topics)；无 pyahocorasick 时退回逐词扫描。"""
+    if _KEYWORD_AUTOMATON is None:
+        return _detect_mood(text), _detect_topics(text)
+    moods: set = set()
+    topics_hit: set = set()
+    for _, hits in _KEYWORD_AUTOMATON.iter(text):
+        for kind, label in hits:
+            if kind == "mood":
+                moods.add(label)
+            else:
+                topics_hit.add(label)
+    # 按关键词表定义顺序取值，与逐词扫描的结果保持一致
+    mood = next((m for m in MOOD_KEYWORDS if m in moods), None)
+    topics = [t for t in TOPIC_KEYWORDS if t in topics_hit]
+    return mood, topics
+
+
+# (cache key, automaton)；key 为 (id(projects), generated_at)，图重建即失效
+_PROJECT_AUTOMATON: Optional[Tuple[Tuple[int, Any], Any]] = None
+
+
+def _project_automaton(projects: List[Dict[str, Any]], generated_at: Any):
+    global _PROJECT_AUTOMATON
+    if ahocorasick is None:
+        return None
+    key = (id(projects), generated_at)
+    if _PROJECT_AUTOMATON is not None and _PROJECT_AUTOMATON[0] == key:
+        return _PROJECT_AUTOMATON[1]
+    automaton = ahocorasick.Automaton()
+    for project in projects:
+        name = project.get("name")
+        if name:
+            automaton.add_word(name, name)
+    if not len(automaton):
+        _PROJECT_AUTOMATON = (key, None)
+        return None
+    automaton.make_automaton()
+    _PROJECT_AUTOMATON = (key, automaton)
+    return automaton
+
+
+def _detect_linked_projects(
+    text: str, projects: List[Dict[str, Any]], generated_at: Any = None
+) -> List[str]:
+    automaton = _project_automaton(projects, generated_at)
+    if automaton is not None:
+        hits = {name for _, name in automaton.iter(text)}
+        return [f"[[{p['name']}]]" for p in projects if p.get("name") in hits]
     linked = []
     for project in projects:
         name = project.get("name")
@@ -61,9 +135,10 @@ def analyze_journal(
     if extra_texts:
         combined = combined + "\n" + "\n".join([t for t in extra_texts if t])
     projects = (graph or {}).get("projects") or []
-    mood = _detect_mood(combined)
-    topics = _detect_topics(combined)
-    linked_projects = _detect_linked_projects(combined, projects)
+    mood, topics = _scan_keywords(combined)
+    linked_projects = _detect_linked_projects(
+        combined, projects, generated_at=(graph or {}).get("generated_at")
+    )
     return {
         "summary": _summarize(text),
         "mood": mood,
@@ -1,33 +1,61 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+import concurrent.futures
 import datetime as dt
+import functools
+import hashlib
 import json
+import re
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from integrations.config import get_config
 from integrations import llm_client
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+def _json_loads(content: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_prompt_cached(path_str: str, mtime_ns: int) -> str:
+    return Path(path_str).read_text(encoding="utf-8")
+
 
 def _load_prompt(path: Path) -> Optional[str]:
+    # mtime 进 key：模板被编辑后自动失效，平时免掉每次请求的重读
     if path and path.exists():
-        return path.read_text(encoding="utf-8")
+        return _load_prompt_cached(str(path), path.stat().st_mtime_ns)
     return None
 
 
+_VAR_RE = re.compile(r"\{\{(\w+)\}\}")
+
+
 def _render_template(template: str, variables: Dict[str, str]) -> str:
-    rendered = template
-    for key, value in variables.items():
-        rendered = rendered.replace(f"{{{{{key}}}}}", value)
-    return rendered
+    # 单趟 re.sub 替换全部 {{var}}，未知变量原样保留（与逐个 replace 等价）
+    return _VAR_RE.sub(lambda m: variables.get(m.group(1), m.group(0)), template)
 
 
 def _json_dump(value: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
     return json.dumps(value, ensure_ascii=False, indent=2)
 
 
-def _llm_results_dir() -> Path:
-    cfg = get_config()
+def _llm_results_dir(cfg: Optional[Dict[str, Any]] = None) -> Path:
+    if cfg is None:
+        cfg = get_config()
     root = Path(str(cfg.get("llm_results_dir", ""))).expanduser()
     if not root:
         raise ValueError("llm_results_dir is not configured")
@@ -35,20 +63,120 @@ def _llm_results_dir() -> Path:
     return root
 
 
-def _save_llm_result(kind: str, payload: Dict[str, Any], root_override: Optional[Path] = None) -> Path:
-    root = root_override or _llm_results_dir()
-    ts = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = root / f"{kind}_{ts}.json"
-    path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
+# 单线程写入队列：结果落盘不占调用方的关键路径，顺序写保证文件不交错
+_RESULT_WRITER = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-save")
+atexit.register(_RESULT_WRITER.shutdown, wait=True)
+
+
+# (秒, 格式化串)：同一秒内的多次落盘复用 strftime 结果
+_TS_CACHE: List[Any] = [0, ""]
+
+
+def _result_timestamp() -> str:
+    now = int(time.time())
+    if _TS_CACHE[0] != now:
+        _TS_CACHE[0] = now
+        _TS_CACHE[1] = time.strftime("%Y%m%d_%H%M%S", time.localtime(now))
+    return _TS_CACHE[1]
+
+
+def _write_llm_result(path: Path, payload: Dict[str, Any]) -> None:
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _save_llm_result(
+    kind: str,
+    payload: Dict[str, Any],
+    root_override: Optional[Path] = None,
+    cfg: Optional[Dict[str, Any]] = None,
+    sync: bool = False,
+) -> Path:
+    root = root_override or _llm_results_dir(cfg)
+    path = root / f"{kind}_{_result_timestamp()}.json"
+    if sync:
+        _write_llm_result(path, payload)
+    else:
+        _RESULT_WRITER.submit(_write_llm_result, path, payload)
     return path
 
 
+# 晚间复盘依赖当天日记全文，同一提示词重复出现几乎必是调试场景，不缓存
+_CACHE_BYPASS_KINDS = {"evening"}
+
+
+def _llm_cache_ttl(cfg: Optional[Dict[str, Any]] = None) -> float:
+    if cfg is None:
+        cfg = get_config()
+    try:
+        return float(cfg.get("llm_cache_ttl_seconds", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _llm_cache_path(kind: str, provider: str, model: str, prompt: str, cfg: Optional[Dict[str, Any]]) -> Path:
+    digest = hashlib.blake2b(
+        f"{provider}\x00{model}\x00{prompt}".encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return _llm_results_dir(cfg) / ".cache" / kind / f"{digest}.json"
+
+
+def _llm_cache_get(
+    kind: str, provider: str, model: str, prompt: str, cfg: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """提示词完全相同且未过期时直接复用上次结果（重试/回看场景免一次调用)。"""
+    ttl = _llm_cache_ttl(cfg)
+    if ttl <= 0 or kind in _CACHE_BYPASS_KINDS:
+        return None
+    path = _llm_cache_path(kind, provider, model, prompt, cfg)
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return None
+        cached = _json_loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    return cached if isinstance(cached, dict) else None
+
+
+def _llm_cache_put(
+    kind: str, provider: str, model: str, prompt: str, result: Dict[str, Any], cfg: Optional[Dict[str, Any]]
+) -> None:
+    if _llm_cache_ttl(cfg) <= 0 or kind in _CACHE_BYPASS_KINDS:
+        return
+    path = _llm_cache_path(kind, provider, model, prompt, cfg)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if orjson is not None:
+            path.write_bytes(orjson.dumps(result))
+        else:
+            path.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+    except OSError:
+        pass
+
+
 def _extract_usage(resp: Any) -> Optional[Dict[str, int]]:
     usage = getattr(resp, "usage", None)
     if not usage:
         return None
     data: Dict[str, Any] = {}
     if isinstance(usage, dict):
+        # 常见形态直接取三个标准键，跳过 model_dump/反射兜底
+        prompt_tokens = usage.get("prompt_tokens")
+        completion_tokens = usage.get("completion_tokens")
+        if prompt_tokens is not None or completion_tokens is not None:
+            result = {}
+            if prompt_tokens is not None:
+                result["input_tokens"] = int(prompt_tokens)
+            if completion_tokens is not None:
+                result["output_tokens"] = int(completion_tokens)
+            total_tokens = usage.get("total_tokens")
+            if total_tokens is None and prompt_tokens is not None and completion_tokens is not None:
+                total_tokens = prompt_tokens + completion_tokens
+            if total_tokens is not None:
+                result["total_tokens"] = int(total_tokens)
+            return result
         data = usage
     else:
         for attr in ("prompt_tokens", "completion_tokens", "total_tokens", "input_tokens", "output_tokens"):
@@ -99,81 +227,232 @@ def _log_llm_usage(kind: str, provider: str, model: str, usage: Optional[Dict[st
     )
 
 
-def _call_llm_json(provider: str, model: str, prompt: str) -> Tuple[Dict[str, Any], Optional[Dict[str, int]]]:
-    cfg = get_config()
-    timeout_seconds = None
+def _llm_timeout_seconds(cfg: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    if cfg is None:
+        cfg = get_config()
     timeout_raw = cfg.get("llm_timeout_seconds")
-    if timeout_raw is not None:
-        try:
-            timeout_seconds = float(timeout_raw)
-        except (TypeError, ValueError):
-            timeout_seconds = None
-    client = llm_client.make_client(provider, timeout_seconds=timeout_seconds)
+    if timeout_raw is None:
+        return None
+    try:
+        return float(timeout_raw)
+    except (TypeError, ValueError):
+        return None
+
+
+def _call_llm_json(
+    provider: str,
+    model: str,
+    prompt: str,
+    on_delta: Optional[Any] = None,
+    cfg: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, int]]]:
+    client = llm_client.make_client(provider, timeout_seconds=_llm_timeout_seconds(cfg))
+    messages = [{"role": "user", "content": prompt}]
+    # 流式接收：网络传输与 Python 侧累积重叠，首 token 就开始消费
+    try:
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+    except TypeError:
+        # SDK/provider 不支持流式参数，退回一次性响应；只兜 create 本身，
+        # 消费/回调/解析阶段的异常照常抛出，避免悄悄重发整个请求
+        stream = None
+    if stream is not None:
+        parts: List[str] = []
+        usage: Optional[Dict[str, int]] = None
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage = _extract_usage(chunk)
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                if on_delta is not None:
+                    on_delta(chunk.choices[0].delta.content)
+        return _json_loads("".join(parts)), usage
     resp = client.chat.completions.create(
         model=model,
-        messages=[{"role": "user", "content": prompt}],
+        messages=messages,
         temperature=0,
     )
     usage = _extract_usage(resp)
     content = resp.choices[0].message.content  # type: ignore
-    return json.loads(content), usage
+    return _json_loads(content), usage
+
+
+# provider+timeout -> AsyncOpenAI；复用连接池避免每次请求重新 TLS 握手
+_ASYNC_CLIENTS: Dict[Tuple[str, Optional[float]], Any] = {}
+
+
+def _get_async_client(provider: str, timeout_seconds: Optional[float]) -> Any:
+    key = (provider, timeout_seconds)
+    client = _ASYNC_CLIENTS.get(key)
+    if client is None:
+        client = llm_client.make_async_client(provider, timeout_seconds=timeout_seconds)
+        _ASYNC_CLIENTS[key] = client
+    return client
+
+
+def llm_concurrency() -> int:
+    try:
+        return int(get_config().get("llm_concurrency", 4))
+    except Exception:
+        return 4
+
+
+async def _call_llm_json_async(
+    provider: str,
+    model: str,
+    prompt: str,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    on_delta: Optional[Any] = None,
+    cfg: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, int]]]:
+    client = _get_async_client(provider, _llm_timeout_seconds(cfg))
+    messages = [{"role": "user", "content": prompt}]
+    async with semaphore or asyncio.Semaphore(1):
+        try:
+            stream = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+        except TypeError:
+            # 同步版同款：只兜不支持 stream 参数的 create，其余异常照常抛
+            stream = None
+        if stream is not None:
+            parts: List[str] = []
+            usage: Optional[Dict[str, int]] = None
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = _extract_usage(chunk)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    if on_delta is not None:
+                        on_delta(chunk.choices[0].delta.content)
+            return _json_loads("".join(parts)), usage
+        resp = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0,
+        )
+    usage = _extract_usage(resp)
+    content = resp.choices[0].message.content  # type: ignore
+    return _json_loads(content), usage
+
+
+def _finish_llm(
+    kind: str,
+    provider: str,
+    model: str,
+    payload: Dict[str, Any],
+    result: Dict[str, Any],
+    usage: Optional[Dict[str, int]],
+    results_dir_override: Optional[Path],
+    cfg: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    if usage:
+        payload["usage"] = usage
+        _log_llm_usage(kind, provider, model, usage)
+    payload["raw_result"] = result
+    saved = _save_llm_result(kind, payload, root_override=results_dir_override, cfg=cfg)
+    result["saved"] = str(saved)
+    return result
+
+
+def _run_llm(
+    kind: str, prepared: Optional[Tuple[str, str, str, Dict[str, Any]]], results_dir_override: Optional[Path]
+) -> Optional[Dict[str, Any]]:
+    if prepared is None:
+        return None
+    # 配置只取一次，同一次调用里的 timeout/结果目录都复用这份字典
+    cfg = get_config()
+    provider, model, prompt, payload = prepared
+    cached = _llm_cache_get(kind, provider, model, prompt, cfg)
+    if cached is not None:
+        payload["cache_hit"] = True
+        return _finish_llm(kind, provider, model, payload, cached, None, results_dir_override, cfg=cfg)
+    try:
+        result, usage = _call_llm_json(provider, model, prompt, cfg=cfg)
+    except Exception as exc:
+        payload["error"] = str(exc)
+        # 出错记录同步写：进程可能马上退出，不能指望后台线程还来得及
+        _save_llm_result(f"{kind}_error", payload, root_override=results_dir_override, cfg=cfg, sync=True)
+        return None
+    # 缓存存解析后的原始结果；"saved" 等落盘后才加的键不入缓存
+    _llm_cache_put(kind, provider, model, prompt, dict(result), cfg)
+    return _finish_llm(kind, provider, model, payload, result, usage, results_dir_override, cfg=cfg)
+
+
+async def _run_llm_async(
+    kind: str,
+    prepared: Optional[Tuple[str, str, str, Dict[str, Any]]],
+    results_dir_override: Optional[Path],
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> Optional[Dict[str, Any]]:
+    if prepared is None:
+        return None
+    cfg = get_config()
+    provider, model, prompt, payload = prepared
+    cached = _llm_cache_get(kind, provider, model, prompt, cfg)
+    if cached is not None:
+        payload["cache_hit"] = True
+        return _finish_llm(kind, provider, model, payload, cached, None, results_dir_override, cfg=cfg)
+    try:
+        result, usage = await _call_llm_json_async(provider, model, prompt, semaphore, cfg=cfg)
+    except Exception as exc:
+        payload["error"] = str(exc)
+        # 出错记录同步写：进程可能马上退出，不能指望后台线程还来得及
+        _save_llm_result(f"{kind}_error", payload, root_override=results_dir_override, cfg=cfg, sync=True)
+        return None
+    # 缓存存解析后的原始结果；"saved" 等落盘后才加的键不入缓存
+    _llm_cache_put(kind, provider, model, prompt, dict(result), cfg)
+    return _finish_llm(kind, provider, model, payload, result, usage, results_dir_override, cfg=cfg)
+
+
+def _brief(item: Dict[str, Any], keys: Tuple[str, ...]) -> Dict[str, Any]:
+    return {k: item.get(k) for k in keys}
+
+
+_PROJECT_BRIEF_KEYS = ("name", "status", "deadline", "target")
+_GOAL_BRIEF_KEYS = ("name", "status", "deadline")
 
 
 def _extract_goal_summary(graph: Dict[str, Any]) -> Dict[str, Any]:
-    goals = graph.get("goals") or []
-    projects = graph.get("projects") or []
-    values = graph.get("values") or []
-    value_summaries = []
-    for value in values:
-        goals_in_value = value.get("goals") or []
-        value_summaries.append(
+    # 扁平的字段表 + 推导式：每个节点只摸一次，字段增删也只改一处
+    return {
+        "values": [
             {
-                "name": value.get("name"),
-                "why": value.get("why"),
+                "name": v.get("name"),
+                "why": v.get("why"),
                 "goals": [
                     {
-                        "name": g.get("name"),
-                        "status": g.get("status"),
-                        "deadline": g.get("deadline"),
-                        "projects": [
-                            {
-                                "name": p.get("name"),
-                                "status": p.get("status"),
-                                "deadline": p.get("deadline"),
-                                "target": p.get("target"),
-                            }
-                            for p in (g.get("projects") or [])
-                        ],
+                        **_brief(g, _GOAL_BRIEF_KEYS),
+                        "projects": [_brief(p, _PROJECT_BRIEF_KEYS) for p in (g.get("projects") or [])],
                     }
-                    for g in goals_in_value
+                    for g in (v.get("goals") or [])
                 ],
             }
-        )
-    return {
-        "values": value_summaries,
-        "goals": [
-            {
-                "name": g.get("name"),
-                "status": g.get("status"),
-                "deadline": g.get("deadline"),
-                "value": g.get("value"),
-            }
-            for g in goals
+            for v in (graph.get("values") or [])
         ],
+        "goals": [_brief(g, _GOAL_BRIEF_KEYS + ("value",)) for g in (graph.get("goals") or [])],
         "projects": [
-            {
-                "name": p.get("name"),
-                "status": p.get("status"),
-                "deadline": p.get("deadline"),
-                "goal": p.get("goal"),
-                "target": p.get("target"),
-            }
-            for p in projects
+            _brief(p, ("name", "status", "deadline", "goal", "target")) for p in (graph.get("projects") or [])
         ],
     }
 
 
-def generate_morning_llm(
+def prepare_goal_graph_context(goal_graph: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """目标图摘要 + 其 JSON 串一次算好；一天内多个生成器共用同一份。"""
+    summary = _extract_goal_summary(goal_graph)
+    return summary, _json_dump(summary)
+
+
+def _prepare_morning_request(
     date: dt.date,
     state: Optional[Dict[str, Any]],
     trends: List[Dict[str, Any]],
@@ -182,8 +461,8 @@ def generate_morning_llm(
     prompt_path_override: Optional[Path] = None,
     provider_override: Optional[str] = None,
     model_override: Optional[str] = None,
-    results_dir_override: Optional[Path] = None,
-) -> Optional[Dict[str, Any]]:
+    goal_context: Optional[Tuple[Dict[str, Any], str]] = None,
+) -> Optional[Tuple[str, str, str, Dict[str, Any]]]:
     cfg = get_config()
     prompt_path = prompt_path_override or Path(str(cfg.get("morning_prompt_path", ""))).expanduser()
     prompt_template = _load_prompt(prompt_path)
@@ -197,11 +476,12 @@ def generate_morning_llm(
     if isinstance(raw_active_goals, list):
         active_goals = [str(item) for item in raw_active_goals if item]
 
+    goal_summary, goal_summary_json = goal_context or prepare_goal_graph_context(goal_graph)
     variables = {
         "date": date.isoformat(),
         "state_summary": _json_dump(state or {}),
         "trend_summary": _json_dump(trends),
-        "goal_graph": _json_dump(_extract_goal_summary(goal_graph)),
+        "goal_graph": goal_summary_json,
         "active_goals": _json_dump(active_goals),
         "progress_summary": "",
         "user_input": _json_dump(inputs),
@@ -218,35 +498,76 @@ def generate_morning_llm(
         "context": {
             "state": state,
             "trends": trends,
-            "goal_graph_summary": _extract_goal_summary(goal_graph),
+            "goal_graph_summary": goal_summary,
             "active_goals": active_goals,
         },
     }
-    try:
-        result, usage = _call_llm_json(provider, model, prompt)
-    except Exception as exc:
-        payload["error"] = str(exc)
-        _save_llm_result("morning_error", payload, root_override=results_dir_override)
-        return None
-    if usage:
-        payload["usage"] = usage
-        _log_llm_usage("morning", provider, model, usage)
-    payload["raw_result"] = result
-    saved = _save_llm_result("morning", payload, root_override=results_dir_override)
-    result["saved"] = str(saved)
-    return result
+    return provider, model, prompt, payload
 
 
-def generate_evening_llm(
+def generate_morning_llm(
     date: dt.date,
-    journal_text: str,
-    records: List[str],
+    state: Optional[Dict[str, Any]],
+    trends: List[Dict[str, Any]],
+    goal_graph: Dict[str, Any],
+    inputs: Dict[str, Optional[str]],
+    prompt_path_override: Optional[Path] = None,
+    provider_override: Optional[str] = None,
+    model_override: Optional[str] = None,
+    results_dir_override: Optional[Path] = None,
+    goal_context: Optional[Tuple[Dict[str, Any], str]] = None,
+) -> Optional[Dict[str, Any]]:
+    prepared = _prepare_morning_request(
+        date,
+        state,
+        trends,
+        goal_graph,
+        inputs,
+        prompt_path_override,
+        provider_override,
+        model_override,
+        goal_context,
+    )
+    return _run_llm("morning", prepared, results_dir_override)
+
+
+async def generate_morning_llm_async(
+    date: dt.date,
+    state: Optional[Dict[str, Any]],
+    trends: List[Dict[str, Any]],
     goal_graph: Dict[str, Any],
+    inputs: Dict[str, Optional[str]],
     prompt_path_override: Optional[Path] = None,
     provider_override: Optional[str] = None,
     model_override: Optional[str] = None,
     results_dir_override: Optional[Path] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    goal_context: Optional[Tuple[Dict[str, Any], str]] = None,
 ) -> Optional[Dict[str, Any]]:
+    prepared = _prepare_morning_request(
+        date,
+        state,
+        trends,
+        goal_graph,
+        inputs,
+        prompt_path_override,
+        provider_override,
+        model_override,
+        goal_context,
+    )
+    return await _run_llm_async("morning", prepared, results_dir_override, semaphore)
+
+
+def _prepare_evening_request(
+    date: dt.date,
+    journal_text: str,
+    records: List[str],
+    goal_graph: Dict[str, Any],
+    prompt_path_override: Optional[Path] = None,
+    provider_override: Optional[str] = None,
+    model_override: Optional[str] = None,
+    goal_context: Optional[Tuple[Dict[str, Any], str]] = None,
+) -> Optional[Tuple[str, str, str, Dict[str, Any]]]:
     cfg = get_config()
     prompt_path = prompt_path_override or Path(str(cfg.get("evening_prompt_path", ""))).expanduser()
     prompt_template = _load_prompt(prompt_path)
@@ -263,13 +584,14 @@ def generate_evening_llm(
     else:
         weekday_label = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"][date.weekday()]
         is_sunday_str = "是" if is_sunday else "否"
+    goal_summary, goal_summary_json = goal_context or prepare_goal_graph_context(goal_graph)
     variables = {
         "date": date.isoformat(),
         "weekday": weekday_label,
         "is_sunday": is_sunday_str,
         "journal_text": journal_text,
         "records": _json_dump(records),
-        "goal_graph": _json_dump(_extract_goal_summary(goal_graph)),
+        "goal_graph": goal_summary_json,
     }
     prompt = _render_template(prompt_template, variables)
     payload = {
@@ -286,24 +608,61 @@ def generate_evening_llm(
             "journal_text": journal_text,
             "records": records,
         },
-        "context": {"goal_graph_summary": _extract_goal_summary(goal_graph)},
+        "context": {"goal_graph_summary": goal_summary},
     }
-    try:
-        result, usage = _call_llm_json(provider, model, prompt)
-    except Exception as exc:
-        payload["error"] = str(exc)
-        _save_llm_result("evening_error", payload, root_override=results_dir_override)
-        return None
-    if usage:
-        payload["usage"] = usage
-        _log_llm_usage("evening", provider, model, usage)
-    payload["raw_result"] = result
-    saved = _save_llm_result("evening", payload, root_override=results_dir_override)
-    result["saved"] = str(saved)
-    return result
+    return provider, model, prompt, payload
 
 
-def generate_alignment_llm(
+def generate_evening_llm(
+    date: dt.date,
+    journal_text: str,
+    records: List[str],
+    goal_graph: Dict[str, Any],
+    prompt_path_override: Optional[Path] = None,
+    provider_override: Optional[str] = None,
+    model_override: Optional[str] = None,
+    results_dir_override: Optional[Path] = None,
+    goal_context: Optional[Tuple[Dict[str, Any], str]] = None,
+) -> Optional[Dict[str, Any]]:
+    prepared = _prepare_evening_request(
+        date,
+        journal_text,
+        records,
+        goal_graph,
+        prompt_path_override,
+        provider_override,
+        model_override,
+        goal_context,
+    )
+    return _run_llm("evening", prepared, results_dir_override)
+
+
+async def generate_evening_llm_async(
+    date: dt.date,
+    journal_text: str,
+    records: List[str],
+    goal_graph: Dict[str, Any],
+    prompt_path_override: Optional[Path] = None,
+    provider_override: Optional[str] = None,
+    model_override: Optional[str] = None,
+    results_dir_override: Optional[Path] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    goal_context: Optional[Tuple[Dict[str, Any], str]] = None,
+) -> Optional[Dict[str, Any]]:
+    prepared = _prepare_evening_request(
+        date,
+        journal_text,
+        records,
+        goal_graph,
+        prompt_path_override,
+        provider_override,
+        model_override,
+        goal_context,
+    )
+    return await _run_llm_async("evening", prepared, results_dir_override, semaphore)
+
+
+def _prepare_alignment_request(
     date: dt.date,
     state: Optional[Dict[str, Any]],
     trends: List[Dict[str, Any]],
@@ -313,8 +672,8 @@ def generate_alignment_llm(
     prompt_path_override: Optional[Path] = None,
     provider_override: Optional[str] = None,
     model_override: Optional[str] = None,
-    results_dir_override: Optional[Path] = None,
-) -> Optional[Dict[str, Any]]:
+    goal_context: Optional[Tuple[Dict[str, Any], str]] = None,
+) -> Optional[Tuple[str, str, str, Dict[str, Any]]]:
     cfg = get_config()
     prompt_path = prompt_path_override or Path(str(cfg.get("alignment_prompt_path", ""))).expanduser()
     prompt_template = _load_prompt(prompt_path)
@@ -323,12 +682,13 @@ def generate_alignment_llm(
     provider = provider_override or str(cfg.get("alignment_provider", "doubao"))
     model = model_override or str(cfg.get("alignment_model", "doubao-seed-1-6-251015"))
 
+    goal_summary, goal_summary_json = goal_context or prepare_goal_graph_context(goal_graph)
     variables = {
         "date": date.isoformat(),
         "state_summary": _json_dump(state or {}),
         "trend_summary": _json_dump(trends),
         "recent_records": _json_dump(records or []),
-        "goal_graph": _json_dump(_extract_goal_summary(goal_graph)),
+        "goal_graph": goal_summary_json,
         "active_goals": _json_dump(active_goals),
     }
     prompt = _render_template(prompt_template, variables)
@@ -347,21 +707,110 @@ def generate_alignment_llm(
         "context": {
             "state": state,
             "trends": trends,
-            "goal_graph_summary": _extract_goal_summary(goal_graph),
+            "goal_graph_summary": goal_summary,
             "active_goals": active_goals,
             "records": records or [],
         },
     }
-    try:
-        result, usage = _call_llm_json(provider, model, prompt)
-    except Exception as exc:
-        payload["error"] = str(exc)
-        _save_llm_result("alignment_error", payload, root_override=results_dir_override)
-        return None
-    if usage:
-        payload["usage"] = usage
-        _log_llm_usage("alignment", provider, model, usage)
-    payload["raw_result"] = result
-    saved = _save_llm_result("alignment", payload, root_override=results_dir_override)
-    result["saved"] = str(saved)
-    return result
+    return provider, model, prompt, payload
+
+
+def generate_alignment_llm(
+    date: dt.date,
+    state: Optional[Dict[str, Any]],
+    trends: List[Dict[str, Any]],
+    goal_graph: Dict[str, Any],
+    active_goals: List[str],
+    records: Optional[List[str]] = None,
+    prompt_path_override: Optional[Path] = None,
+    provider_override: Optional[str] = None,
+    model_override: Optional[str] = None,
+    results_dir_override: Optional[Path] = None,
+    goal_context: Optional[Tuple[Dict[str, Any], str]] = None,
+) -> Optional[Dict[str, Any]]:
+    prepared = _prepare_alignment_request(
+        date,
+        state,
+        trends,
+        goal_graph,
+        active_goals,
+        records,
+        prompt_path_override,
+        provider_override,
+        model_override,
+        goal_context,
+    )
+    return _run_llm("alignment", prepared, results_dir_override)
+
+
+def run_daily_llm_bundle(
+    date: dt.date,
+    state: Optional[Dict[str, Any]],
+    trends: List[Dict[str, Any]],
+    goal_graph: Dict[str, Any],
+    inputs: Dict[str, Optional[str]],
+    active_goals: List[str],
+    records: Optional[List[str]] = None,
+    results_dir_override: Optional[Path] = None,
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """早晨 + 对齐两次独立调用并发跑完，总耗时 ≈ 两者中较慢的一个。"""
+
+    async def _bundle() -> Dict[str, Optional[Dict[str, Any]]]:
+        semaphore = asyncio.Semaphore(llm_concurrency())
+        # 目标图摘要/序列化只做一次，早晨和对齐两个提示词共用
+        goal_context = prepare_goal_graph_context(goal_graph)
+        morning, alignment = await asyncio.gather(
+            generate_morning_llm_async(
+                date,
+                state,
+                trends,
+                goal_graph,
+                inputs,
+                results_dir_override=results_dir_override,
+                semaphore=semaphore,
+                goal_context=goal_context,
+            ),
+            generate_alignment_llm_async(
+                date,
+                state,
+                trends,
+                goal_graph,
+                active_goals,
+                records,
+                results_dir_override=results_dir_override,
+                semaphore=semaphore,
+                goal_context=goal_context,
+            ),
+        )
+        return {"morning": morning, "alignment": alignment}
+
+    return asyncio.run(_bundle())
+
+
+async def generate_alignment_llm_async(
+    date: dt.date,
+    state: Optional[Dict[str, Any]],
+    trends: List[Dict[str, Any]],
+    goal_graph: Dict[str, Any],
+    active_goals: List[str],
+    records: Optional[List[str]] = None,
+    prompt_path_override: Optional[Path] = None,
+    provider_override: Optional[str] = None,
+    model_override: Optional[str] = None,
+    results_dir_override: Optional[Path] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    goal_context: Optional[Tuple[Dict[str, Any], str]] = None,
+) -> Optional[Dict[str, Any]]:
+    prepared = _prepare_alignment_request(
+        date,
+        state,
+        trends,
+        goal_graph,
+        active_goals,
+        records,
+        prompt_path_override,
+        provider_override,
+        model_override,
+        goal_context,
+    )
+    return await _run_llm_async("alignment", prepared, results_dir_override, semaphore)
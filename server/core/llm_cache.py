@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+"""Exact-match disk cache for deterministic (temperature=0) LLM calls.
+
+key 由 (model, prompt 内容) 的 SHA256 组成；相同输入直接返回缓存 JSON，
+省掉一次完整网络往返。缓存文件放在 cache_root/llm_cache/ 下，一个 key
+一个文件，读写失败时静默降级为未命中/不写入。
+"""
+
+import hashlib
+import json
+import math
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from integrations.config import get_config
+
+DEFAULT_SEMANTIC_THRESHOLD = 0.95
+
+
+def _cache_dir() -> Optional[Path]:
+    try:
+        cfg = get_config()
+        cache_root = Path(str(cfg.get("cache_root", ""))).expanduser()
+    except Exception:
+        return None
+    if not str(cache_root) or str(cache_root) == ".":
+        return None
+    return cache_root / "llm_cache"
+
+
+def make_key(*parts: Optional[str]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return None
+    path = cache_dir / f"{key}.json"
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def put(key: str, value: Dict[str, Any]) -> None:
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        path = cache_dir / f"{key}.json"
+        path.write_text(json.dumps(value, ensure_ascii=False), encoding="utf-8")
+    except Exception:
+        pass
+
+
+# --- 语义缓存：近似重复的输入（"早上好，帮我安排今天" vs "早安，安排一下今天"）
+# 用字符 bigram 余弦相似度匹配，超过阈值直接复用缓存结果，省一次模型调用。
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+def _char_bigrams(text: str) -> Counter:
+    if len(text) < 2:
+        return Counter([text] if text else [])
+    return Counter(text[i : i + 2] for i in range(len(text) - 1))
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b[gram] for gram, count in a.items())
+    norm = math.sqrt(sum(c * c for c in a.values())) * math.sqrt(sum(c * c for c in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def _semantic_path() -> Optional[Path]:
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return None
+    return cache_dir / "semantic_cache.jsonl"
+
+
+def _semantic_threshold() -> float:
+    try:
+        cfg = get_config()
+        return float(cfg.get("semantic_threshold", DEFAULT_SEMANTIC_THRESHOLD))
+    except Exception:
+        return DEFAULT_SEMANTIC_THRESHOLD
+
+
+def semantic_get(model: str, user_text: str, threshold: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    path = _semantic_path()
+    if path is None or not path.exists():
+        return None
+    if threshold is None:
+        threshold = _semantic_threshold()
+    query = _char_bigrams(_normalize_text(user_text))
+    best_score = 0.0
+    best_value: Optional[Dict[str, Any]] = None
+    try:
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry.get("model") != model:
+                continue
+            score = _cosine(query, _char_bigrams(entry.get("text", "")))
+            if score > best_score:
+                best_score = score
+                best_value = entry.get("value")
+    except Exception:
+        return None
+    if best_score >= threshold:
+        return best_value
+    return None
+
+
+def semantic_put(model: str, user_text: str, value: Dict[str, Any]) -> None:
+    path = _semantic_path()
+    if path is None:
+        return
+    entry = {"model": model, "text": _normalize_text(user_text), "value": value}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except Exception:
+        pass
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import atexit
 import datetime as dt
 import json
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import IO, Any, Dict, List, Optional
 
 from integrations.config import get_config
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
 
 def _records_root() -> Path:
     cfg = get_config()
@@ -17,6 +23,31 @@ def _records_root() -> Path:
     return root
 
 
+# 按文件缓存追加句柄：同一天连续记录时免掉每条 open/close 的系统调用
+_APPEND_HANDLES: Dict[str, IO[Any]] = {}
+
+
+def _append_handle(path: Path) -> IO[Any]:
+    key = str(path)
+    handle = _APPEND_HANDLES.get(key)
+    if handle is None or handle.closed:
+        handle = path.open("ab") if orjson is not None else path.open("a", encoding="utf-8")
+        _APPEND_HANDLES[key] = handle
+    return handle
+
+
+def _close_append_handles() -> None:
+    for handle in _APPEND_HANDLES.values():
+        try:
+            handle.close()
+        except Exception:
+            pass
+    _APPEND_HANDLES.clear()
+
+
+atexit.register(_close_append_handles)
+
+
 def add_record(date: dt.date, text: str, source: str = "manual") -> Path:
     payload = {
         "timestamp": dt.datetime.now().isoformat(),
@@ -25,8 +56,13 @@ def add_record(date: dt.date, text: str, source: str = "manual") -> Path:
         "text": text,
     }
     path = _records_root() / f"{date.isoformat()}.jsonl"
-    with path.open("a", encoding="utf-8") as handle:
+    handle = _append_handle(path)
+    if orjson is not None:
+        handle.write(orjson.dumps(payload) + b"\n")
+    else:
         handle.write(json.dumps(payload, ensure_ascii=True) + "\n")
+    # 每条都 flush：句柄常驻但记录随写随见（load_records 读同一文件）
+    handle.flush()
     return path
 
 
@@ -35,19 +71,21 @@ def load_records(date: dt.date) -> List[Dict[str, str]]:
     if not path.exists():
         return []
     records: List[Dict[str, str]] = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            data = json.loads(line)
-        except Exception:
-            continue
-        if not isinstance(data, dict):
-            continue
-        text = data.get("text")
-        if text:
-            records.append(data)
+    # 逐行惰性读取：避免整文件字符串 + splitlines 的双份峰值内存
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = orjson.loads(line) if orjson is not None else json.loads(line)
+            except Exception:
+                continue
+            if not isinstance(data, dict):
+                continue
+            text = data.get("text")
+            if text:
+                records.append(data)
     return records
 
 
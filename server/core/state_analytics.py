@@ -7,6 +7,13 @@ from integrations.config import get_config
 
 from . import state_recorder
 
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+METRIC_KEYS = ("sleep_minutes", "stress_level", "screen_minutes", "hrv_ms")
+
 
 def _avg(values: Iterable[Optional[float]]) -> Optional[float]:
     items = [v for v in values if v is not None]
@@ -27,6 +34,23 @@ def _extract_metrics(state: Dict[str, Any]) -> Dict[str, Optional[float]]:
     }
 
 
+def _metric_means(metrics: List[Dict[str, Optional[float]]]) -> Dict[str, Optional[float]]:
+    """四个指标的均值一次算完；有 NumPy 时用 nanmean 做单次 C 级归约。"""
+    if np is not None and metrics:
+        arr = np.array(
+            [[(m.get(k) if m.get(k) is not None else np.nan) for k in METRIC_KEYS] for m in metrics],
+            dtype=np.float64,
+        )
+        import warnings
+
+        with warnings.catch_warnings():
+            # 全 NaN 列（无数据的指标）会触发 RuntimeWarning，语义上就是 None
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            means = np.nanmean(arr, axis=0)
+        return {k: (None if np.isnan(v) else float(v)) for k, v in zip(METRIC_KEYS, means)}
+    return {k: _avg([m.get(k) for m in metrics]) for k in METRIC_KEYS}
+
+
 def _parse_windows(value: Any, default: Optional[List[int]] = None) -> List[int]:
     if default is None:
         default = [7, 30]
@@ -51,40 +75,51 @@ def get_trend_windows() -> List[int]:
     return _parse_windows(cfg.get("advice_trend_windows_days"))
 
 
-def _collect_states(
-    end_date: dt.date, window_days: int
-) -> List[Dict[str, Any]]:
-    states = []
-    for offset in range(window_days):
+def _load_states_map(end_date: dt.date, days: int) -> Dict[dt.date, Dict[str, Any]]:
+    """一次把 end_date 往前 days 天的状态读进内存，供多个窗口切片复用。"""
+    states: Dict[dt.date, Dict[str, Any]] = {}
+    for offset in range(days):
         date = end_date - dt.timedelta(days=offset)
         state = state_recorder.load_daily_state(date)
         if state:
-            states.append(state)
+            states[date] = state
     return states
 
 
-def summarize_state_trends(end_date: dt.date, window_days: int) -> Dict[str, Any]:
-    current_states = _collect_states(end_date, window_days)
-    prev_states = _collect_states(end_date - dt.timedelta(days=window_days), window_days)
-
-    current_metrics = [_extract_metrics(s) for s in current_states]
-    prev_metrics = [_extract_metrics(s) for s in prev_states]
-
-    def metric_avg(items: List[Dict[str, Optional[float]]], key: str) -> Optional[float]:
-        return _avg([m.get(key) for m in items])
-
-    summary = {
+def summarize_state_trends(
+    end_date: dt.date,
+    window_days: int,
+    states_by_date: Optional[Dict[dt.date, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    # 当前窗口和对照窗口一趟扫完：offset < window_days 归当前，其余归对照
+    current_metrics: List[Dict[str, Optional[float]]] = []
+    prev_metrics: List[Dict[str, Optional[float]]] = []
+    for offset in range(window_days * 2):
+        date = end_date - dt.timedelta(days=offset)
+        if states_by_date is not None:
+            state = states_by_date.get(date)
+        else:
+            state = state_recorder.load_daily_state(date)
+        if not state:
+            continue
+        bucket = current_metrics if offset < window_days else prev_metrics
+        bucket.append(_extract_metrics(state))
+
+    cur_means = _metric_means(current_metrics)
+    prev_means = _metric_means(prev_metrics)
+
+    summary: Dict[str, Any] = {
         "window_days": window_days,
-        "count": len(current_states),
-        "sleep_minutes_avg": metric_avg(current_metrics, "sleep_minutes"),
-        "stress_level_avg": metric_avg(current_metrics, "stress_level"),
-        "screen_minutes_avg": metric_avg(current_metrics, "screen_minutes"),
-        "hrv_ms_avg": metric_avg(current_metrics, "hrv_ms"),
+        "count": len(current_metrics),
+        "sleep_minutes_avg": cur_means["sleep_minutes"],
+        "stress_level_avg": cur_means["stress_level"],
+        "screen_minutes_avg": cur_means["screen_minutes"],
+        "hrv_ms_avg": cur_means["hrv_ms"],
     }
 
     def delta(metric: str) -> Optional[float]:
-        cur = metric_avg(current_metrics, metric)
-        prev = metric_avg(prev_metrics, metric)
+        cur = cur_means[metric]
+        prev = prev_means[metric]
         if cur is None or prev is None:
             return None
         return cur - prev
@@ -102,4 +137,8 @@ def summarize_state_trends(end_date: dt.date, window_days: int) -> Dict[str, Any
 
 def summarize_multi_windows(end_date: dt.date, windows: Optional[List[int]] = None) -> List[Dict[str, Any]]:
     window_list = windows or get_trend_windows()
-    return [summarize_state_trends(end_date, w) for w in window_list]
+    if not window_list:
+        return []
+    # 小窗口是大窗口的子集：按 2*max(w)（含对照期）读一次盘，各窗口在内存里切片
+    states_map = _load_states_map(end_date, max(window_list) * 2)
+    return [summarize_state_trends(end_date, w, states_by_date=states_map) for w in window_list]
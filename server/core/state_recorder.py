@@ -6,16 +6,41 @@ import re
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from integrations.config import get_config
+from integrations.config import as_path, get_config
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+# 模块级预编译；原先的 r"(\\d+)" 写法匹配的是字面反斜杠加 d，永远抓不到数字
+_DIGITS_RE = re.compile(r"(\d+)")
+
+
+def _json_loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 def _to_minutes(value: Optional[Any]) -> Optional[int]:
+    # JSON 来的值绝大多数就是 int/str，先做精确类型分派再走慢路径
+    t = type(value)
+    if t is int:
+        return value
+    if t is float:
+        return int(value)
     if value is None:
         return None
-    if isinstance(value, (int, float)):
+    if isinstance(value, (int, float)):  # bool 子类等罕见情况兜底
         return int(value)
-    text = str(value)
-    matches = re.findall(r"(\\d+)", text)
+    text = value if t is str else str(value)
+    matches = _DIGITS_RE.findall(text)
     if not matches:
         return None
     nums = [int(n) for n in matches]
@@ -47,6 +72,18 @@ def _average(values: list[float]) -> Optional[float]:
     return sum(values) / len(values)
 
 
+def _sample_mean(samples: Optional[list], key: str) -> Optional[float]:
+    """样本列表里某个数值字段的均值；有 NumPy 时 fromiter+mean 免掉中间列表。"""
+    if np is not None:
+        arr = np.fromiter(
+            (float(s[key]) for s in samples or [] if type(s) is dict and s.get(key) is not None),
+            dtype=np.float64,
+        )
+        return float(arr.mean()) if arr.size else None
+    values = [float(s[key]) for s in samples or [] if type(s) is dict and s.get(key) is not None]
+    return _average(values)
+
+
 def _parse_iso_datetime(value: Optional[str]) -> Optional[dt.datetime]:
     if not value:
         return None
@@ -74,7 +111,7 @@ def _normalize_phone_usage(phone: Dict[str, Any]) -> Dict[str, Any]:
     unlock_count = unlock.get("count")
     apps = []
     for entry in phone.get("app_usage") or []:
-        if not isinstance(entry, dict):
+        if type(entry) is not dict:  # 指针比较；样本循环里省掉 isinstance 的慢路径
             continue
         name = entry.get("app")
         minutes = entry.get("minutes")
@@ -111,36 +148,110 @@ def _normalize_sleep(sleep: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _normalize_health_sleep(health: Dict[str, Any]) -> Dict[str, Any]:
-    stage_totals: Dict[str, int] = {"deep": 0, "light": 0, "rem": 0, "awake": 0}
-    stage_samples = health.get("sleepStages") or []
+# 常见枚举值（Garmin/Apple/HealthConnect）直接查表，查不到再退回子串扫描
+_STAGE_EXACT = {
+    "deep": "deep",
+    "deep_sleep": "deep",
+    "light": "light",
+    "light_sleep": "light",
+    "rem": "rem",
+    "rem_sleep": "rem",
+    "awake": "awake",
+    "wake": "awake",
+    "out_of_bed": "awake",
+}
+
+
+def _classify_stage(stage_raw: str) -> Optional[str]:
+    key = _STAGE_EXACT.get(stage_raw)
+    if key is not None:
+        return key
+    if "deep" in stage_raw:
+        return "deep"
+    if "light" in stage_raw:
+        return "light"
+    if "rem" in stage_raw:
+        return "rem"
+    if "awake" in stage_raw or "out" in stage_raw:
+        return "awake"
+    return None
+
+
+def _vector_stage_totals(stage_samples: list) -> Optional[Dict[str, int]]:
+    """成百上千条分期样本时用 datetime64 批量算时长；任何不规整就返回 None 走逐条路径。
+
+    numpy 解析带时区的 ISO 串不可靠，所以只接受全部无时区或 UTC（Z 结尾）的样本。
+    """
+    if np is None:
+        return None
+    keys: list = []
+    starts: list = []
+    ends: list = []
     for sample in stage_samples:
-        if not isinstance(sample, dict):
+        if type(sample) is not dict:
             continue
         stage_raw = str(sample.get("stage") or "").lower()
         if not stage_raw:
             continue
-        if "deep" in stage_raw:
-            key = "deep"
-        elif "light" in stage_raw:
-            key = "light"
-        elif "rem" in stage_raw:
-            key = "rem"
-        elif "awake" in stage_raw or "out" in stage_raw:
-            key = "awake"
-        else:
+        key = _classify_stage(stage_raw)
+        if key is None:
             continue
-        start = _parse_iso_datetime(sample.get("startTime"))
-        end = _parse_iso_datetime(sample.get("endTime"))
-        minutes = _duration_minutes(start, end)
-        if minutes is not None:
-            stage_totals[key] += minutes
+        start = sample.get("startTime")
+        end = sample.get("endTime")
+        if type(start) is not str or type(end) is not str:
+            return None
+        keys.append(key)
+        starts.append(start)
+        ends.append(end)
+    totals: Dict[str, int] = {"deep": 0, "light": 0, "rem": 0, "awake": 0}
+    if not keys:
+        return totals
+    cleaned: list = []
+    for value in starts + ends:
+        if value.endswith("Z"):
+            value = value[:-1]
+        tail = value[11:]
+        if "+" in tail or "-" in tail:  # 带时区偏移，交给 fromisoformat
+            return None
+        cleaned.append(value)
+    try:
+        stamps = np.array(cleaned, dtype="datetime64[s]")
+    except ValueError:
+        return None
+    half = len(keys)
+    seconds = (stamps[half:] - stamps[:half]).astype(np.int64)
+    minutes = np.rint(seconds / 60).astype(np.int64)
+    for key, sample_minutes, span in zip(keys, minutes, seconds):
+        if span >= 0:  # 与逐条路径一致：负时长丢弃
+            totals[key] += int(sample_minutes)
+    return totals
+
+
+def _normalize_health_sleep(health: Dict[str, Any]) -> Dict[str, Any]:
+    stage_samples = health.get("sleepStages") or []
+    stage_totals = _vector_stage_totals(stage_samples)
+    if stage_totals is None:
+        stage_totals = {"deep": 0, "light": 0, "rem": 0, "awake": 0}
+        for sample in stage_samples:
+            if type(sample) is not dict:
+                continue
+            stage_raw = str(sample.get("stage") or "").lower()
+            if not stage_raw:
+                continue
+            key = _classify_stage(stage_raw)
+            if key is None:
+                continue
+            start = _parse_iso_datetime(sample.get("startTime"))
+            end = _parse_iso_datetime(sample.get("endTime"))
+            minutes = _duration_minutes(start, end)
+            if minutes is not None:
+                stage_totals[key] += minutes
 
     total_minutes = sum(stage_totals.values()) if any(stage_totals.values()) else None
     if total_minutes is None:
         session_minutes = 0
         for session in health.get("sleepSessions") or []:
-            if not isinstance(session, dict):
+            if type(session) is not dict:
                 continue
             start = _parse_iso_datetime(session.get("startTime"))
             end = _parse_iso_datetime(session.get("endTime"))
@@ -175,7 +286,7 @@ def normalize_mobile_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
         night_screen_minutes = int(round(float(night_usage_ms) / 60000))
     apps = []
     for entry in payload.get("usageByApp") or payload.get("usage_by_app") or []:
-        if not isinstance(entry, dict):
+        if type(entry) is not dict:
             continue
         name = entry.get("packageName") or entry.get("name") or entry.get("app")
         total_ms = entry.get("totalTimeMs") or entry.get("total_time_ms")
@@ -187,7 +298,7 @@ def normalize_mobile_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     night_apps = []
     for entry in payload.get("nightUsageByApp") or payload.get("night_usage_by_app") or []:
-        if not isinstance(entry, dict):
+        if type(entry) is not dict:
             continue
         name = entry.get("packageName") or entry.get("name") or entry.get("app")
         total_ms = entry.get("totalTimeMs") or entry.get("total_time_ms")
@@ -209,12 +320,8 @@ def normalize_mobile_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     health = payload.get("health") or {}
     if isinstance(health, dict):
-        hrv_samples = [s.get("rmssdMs") for s in health.get("hrvRmssd") or [] if isinstance(s, dict)]
-        hrv_values = [float(v) for v in hrv_samples if v is not None]
-        hrv_ms = _average(hrv_values)
-        resting_samples = [s.get("bpm") for s in health.get("restingHeartRate") or [] if isinstance(s, dict)]
-        resting_values = [float(v) for v in resting_samples if v is not None]
-        resting_bpm = _average(resting_values)
+        hrv_ms = _sample_mean(health.get("hrvRmssd"), "rmssdMs")
+        resting_bpm = _sample_mean(health.get("restingHeartRate"), "bpm")
         if hrv_ms is not None:
             normalized["hrv_ms"] = int(round(hrv_ms))
         if resting_bpm is not None:
@@ -222,8 +329,7 @@ def normalize_mobile_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
     return normalized
 
 
-def _normalize_garmin_sleep(sleep: Dict[str, Any]) -> Dict[str, Any]:
-    daily = sleep.get("dailySleepDTO") or {}
+def _normalize_garmin_sleep(daily: Dict[str, Any]) -> Dict[str, Any]:
     scores = daily.get("sleepScores") or {}
     overall = scores.get("overall") or {}
     score = overall.get("value") or daily.get("sleepScore")
@@ -242,8 +348,9 @@ def normalize_garmin_result(payload: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(data, dict):
         data = payload or {}
     sleep = data.get("sleep") or {}
+    # DTO 只取一次，睡眠归一化直接用同一份
     daily = sleep.get("dailySleepDTO") or {}
-    normalized_sleep = _normalize_garmin_sleep(sleep)
+    normalized_sleep = _normalize_garmin_sleep(daily)
 
     hrv = data.get("hrv") or {}
     hrv_summary = hrv.get("hrvSummary") or {}
@@ -351,6 +458,21 @@ def build_daily_state_from_garmin(date: dt.date, payload: Dict[str, Any]) -> Dic
     }
 
 
+# normalized 的固定 schema：各 normalizer 都只产出这些键，新增字段需同步这里
+_SLEEP_KEYS = ("total_minutes", "deep_minutes", "rem_minutes", "light_minutes", "awake_minutes", "score")
+_PHONE_KEYS = ("screen_time_minutes", "night_screen_minutes", "unlock_count", "top_apps", "night_top_apps")
+_SECTION_KEYS = {"sleep": _SLEEP_KEYS, "phone_usage": _PHONE_KEYS}
+
+
+def _merge_section(existing: Optional[Dict[str, Any]], incoming: Dict[str, Any], keys: tuple) -> Dict[str, Any]:
+    merged = dict(existing or {})
+    for key in keys:
+        value = incoming.get(key)
+        if value is not None:
+            merged[key] = value
+    return merged
+
+
 def merge_daily_state(existing: Optional[Dict[str, Any]], incoming: Dict[str, Any]) -> Dict[str, Any]:
     if not existing:
         return incoming
@@ -364,12 +486,9 @@ def merge_daily_state(existing: Optional[Dict[str, Any]], incoming: Dict[str, An
     merged_normalized = dict(existing.get("normalized") or {})
     incoming_normalized = incoming.get("normalized") or {}
     for key, value in incoming_normalized.items():
-        if key in {"sleep", "phone_usage"} and isinstance(value, dict):
-            merged_section = dict(merged_normalized.get(key) or {})
-            for section_key, section_value in value.items():
-                if section_value is not None:
-                    merged_section[section_key] = section_value
-            merged_normalized[key] = merged_section
+        section_keys = _SECTION_KEYS.get(key)
+        if section_keys is not None and type(value) is dict:
+            merged_normalized[key] = _merge_section(merged_normalized.get(key), value, section_keys)
         elif value is not None:
             merged_normalized[key] = value
 
@@ -380,7 +499,7 @@ def merge_daily_state(existing: Optional[Dict[str, Any]], incoming: Dict[str, An
 
 def save_daily_state(state: Dict[str, Any], state_root: Optional[Path] = None) -> Path:
     cfg = get_config()
-    root = state_root or Path(str(cfg.get("state_root", ""))).expanduser()
+    root = state_root or as_path(cfg.get("state_root"))
     if not root:
         raise ValueError("state_root is not configured")
     root.mkdir(parents=True, exist_ok=True)
@@ -388,32 +507,37 @@ def save_daily_state(state: Dict[str, Any], state_root: Optional[Path] = None) -
     if not date_str:
         raise ValueError("state.date is required")
     path = root / f"{date_str}.json"
-    path.write_text(json.dumps(state, ensure_ascii=True, indent=2), encoding="utf-8")
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+    else:
+        # json.dump 直接写文件句柄：不生成整份字符串再转码，大 raw 负载峰值内存减半
+        with path.open("w", encoding="utf-8") as fp:
+            json.dump(state, fp, ensure_ascii=True, indent=2)
     return path
 
 
 def load_daily_state(date: dt.date, state_root: Optional[Path] = None) -> Optional[Dict[str, Any]]:
     cfg = get_config()
-    root = state_root or Path(str(cfg.get("state_root", ""))).expanduser()
+    root = state_root or as_path(cfg.get("state_root"))
     if not root:
         raise ValueError("state_root is not configured")
     path = root / f"{date.isoformat()}.json"
     if not path.exists():
         return None
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        return _json_loads(path.read_bytes())
     except Exception:
         return None
 
 
 def load_vision_result(path: Path) -> Dict[str, Any]:
-    data = json.loads(path.read_text(encoding="utf-8"))
+    data = _json_loads(path.read_bytes())
     if isinstance(data, dict) and data.get("result"):
         return data.get("result") or {}
     raw = data.get("raw") if isinstance(data, dict) else None
     if isinstance(raw, str):
         try:
-            return json.loads(raw)
+            return _json_loads(raw)
         except Exception:
             return {}
     return {}
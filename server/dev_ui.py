@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
-"""Auto-restart UI server on file changes (no extra deps).
+"""Auto-restart UI server on file changes.
+
+Uses watchdog (kernel file events, zero idle cost) when installed and
+falls back to the original 1s stat() polling loop otherwise.
 
 Usage: python dev_ui.py --port 8000
 """
@@ -11,9 +14,17 @@ import os
 import signal
 import subprocess
 import sys
+import threading
 import time
 from pathlib import Path
 
+try:
+    from watchdog.events import FileSystemEventHandler  # type: ignore
+    from watchdog.observers import Observer  # type: ignore
+except ImportError:  # pragma: no cover
+    FileSystemEventHandler = object  # type: ignore
+    Observer = None  # type: ignore
+
 
 def parse_args(argv):
     parser = argparse.ArgumentParser(description="Dev runner with auto-reload.")
@@ -38,6 +49,29 @@ def changed(prev, curr):
     return False
 
 
+class _WatchHandler(FileSystemEventHandler):  # type: ignore[misc]
+    """收到被监听文件的任何事件就置位；主循环睡在 Event 上而不是轮询。"""
+
+    def __init__(self, names: set, event: threading.Event) -> None:
+        self._names = names
+        self._event = event
+
+    def on_any_event(self, fs_event) -> None:  # pragma: no cover - 依赖 watchdog
+        src = getattr(fs_event, "src_path", "") or ""
+        dest = getattr(fs_event, "dest_path", "") or ""
+        if Path(src).name in self._names or Path(dest).name in self._names:
+            self._event.set()
+
+
+def _restart(proc, cmd, root):
+    try:
+        proc.send_signal(signal.SIGTERM)
+    except Exception:
+        pass
+    proc.wait(timeout=5)
+    return subprocess.Popen(cmd, cwd=str(root))
+
+
 def main(argv=None) -> int:
     args = parse_args(argv or [])
     root = Path(__file__).resolve().parent
@@ -50,20 +84,38 @@ def main(argv=None) -> int:
 
     cmd = [sys.executable, str(root / "ui_server.py"), "--port", args.port]
     proc = subprocess.Popen(cmd, cwd=str(root))
-    mtimes = collect_mtimes(watch_files)
 
+    if Observer is not None:
+        event = threading.Event()
+        observer = Observer()
+        observer.schedule(_WatchHandler({p.name for p in watch_files}, event), str(root), recursive=False)
+        observer.start()
+        try:
+            while True:
+                event.wait()
+                # 编辑器保存常是连续多个事件，稍等再清位，一次重启收完
+                time.sleep(0.2)
+                event.clear()
+                proc = _restart(proc, cmd, root)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            observer.stop()
+            observer.join()
+            try:
+                proc.send_signal(signal.SIGTERM)
+            except Exception:
+                pass
+        return 0
+
+    mtimes = collect_mtimes(watch_files)
     try:
         while True:
             time.sleep(1)
             new_mtimes = collect_mtimes(watch_files)
             if changed(mtimes, new_mtimes):
                 mtimes = new_mtimes
-                try:
-                    proc.send_signal(signal.SIGTERM)
-                except Exception:
-                    pass
-                proc.wait(timeout=5)
-                proc = subprocess.Popen(cmd, cwd=str(root))
+                proc = _restart(proc, cmd, root)
     except KeyboardInterrupt:
         pass
     finally:
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import os
+import re
 from pathlib import Path
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
 
 
 def _repo_root() -> Path:
@@ -22,24 +24,31 @@ def _coerce_value(raw: str):
     return raw
 
 
+# 整段文本一趟 finditer：跳过注释行，抓 key: value，免去逐行 strip/split 的临时串
+# 空白只允许 [ \t]：\s 会吞换行，导致空值行把下一行卷进来
+_YAML_LINE_RE = re.compile(r"^(?![ \t]*#)[ \t]*([A-Za-z0-9_-]+)[ \t]*:[ \t]*(.*?)[ \t]*$", re.MULTILINE)
+
+
 def _parse_simple_yaml(text: str) -> Dict[str, object]:
     data: Dict[str, object] = {}
-    for line in text.splitlines():
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
-            continue
-        if ":" not in stripped:
-            continue
-        key, value = stripped.split(":", 1)
-        key = key.strip()
-        value = value.strip()
+    for match in _YAML_LINE_RE.finditer(text):
+        key, value = match.group(1), match.group(2)
         if value.startswith(("'", '"')) and value.endswith(("'", '"')):
             value = value[1:-1]
         data[key] = _coerce_value(value)
     return data
 
 
-def load_config(path: Optional[Path] = None) -> Dict[str, object]:
+def _freeze_config(data: Dict[str, object]) -> Mapping[str, object]:
+    """路径类键（*_root/*_dir/*_path）加载时就 expanduser 成 Path，只做一次；
+    整体包成只读视图，下游拿到的永远是同一份预解析结果。"""
+    for key, value in data.items():
+        if isinstance(value, str) and value and key.endswith(("_root", "_dir", "_path")):
+            data[key] = Path(value).expanduser()
+    return MappingProxyType(data)
+
+
+def load_config(path: Optional[Path] = None) -> Mapping[str, object]:
     cfg_path = path or Path(os.environ.get("LIFE_MENTOR_CONFIG", "")).expanduser()
     if not cfg_path or str(cfg_path) == ".":
         cfg_path = _default_config_path()
@@ -52,15 +61,22 @@ def load_config(path: Optional[Path] = None) -> Dict[str, object]:
         data = yaml.safe_load(text) or {}
         if not isinstance(data, dict):
             raise ValueError("config.yaml must be a mapping at top level")
-        return data
     except Exception:
-        return _parse_simple_yaml(text)
+        data = _parse_simple_yaml(text)
+    return _freeze_config(data)
+
+
+def as_path(value: object) -> Path:
+    """取配置里的路径值：加载时已是 Path 的直接用，字符串兜底再转一次。"""
+    if isinstance(value, Path):
+        return value
+    return Path(str(value or "")).expanduser()
 
 
-_CACHED: Optional[Dict[str, object]] = None
+_CACHED: Optional[Mapping[str, object]] = None
 
 
-def get_config(path: Optional[Path] = None) -> Dict[str, object]:
+def get_config(path: Optional[Path] = None) -> Mapping[str, object]:
     global _CACHED
     if _CACHED is None or path is not None:
         _CACHED = load_config(path)
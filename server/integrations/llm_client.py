@@ -8,6 +8,28 @@ try:
 except ImportError:  # pragma: no cover
     OpenAI = None  # type: ignore
 
+try:
+    from openai import AsyncOpenAI
+except ImportError:  # pragma: no cover
+    AsyncOpenAI = None  # type: ignore
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore
+
+
+def _http2_available() -> bool:
+    # httpx 的 http2=True 需要可选的 h2 包，缺了会直接抛错
+    if httpx is None:
+        return False
+    try:
+        import h2  # type: ignore  # noqa: F401
+
+        return True
+    except ImportError:
+        return False
+
 
 PROVIDERS = {
     "doubao": {
@@ -29,25 +51,62 @@ PROVIDERS = {
 }
 
 
-def make_client(
+def _client_kwargs(
     provider: str,
-    timeout_seconds: float | None = None,
-    max_retries: int | None = None,
-) -> Any:
-    if OpenAI is None:
-        raise RuntimeError("Missing dependency: pip install openai")
+    timeout_seconds: float | None,
+    max_retries: int | None,
+) -> dict[str, Any]:
     if provider not in PROVIDERS:
         raise ValueError(f"Unknown provider: {provider}")
     info = PROVIDERS[provider]
     api_key = os.getenv(info["api_key_env"])
     if not api_key:
         raise RuntimeError(f"Missing env {info['api_key_env']}")
-    client_kwargs: dict[str, Any] = {}
+    client_kwargs: dict[str, Any] = {"api_key": api_key}
     if timeout_seconds is not None:
         client_kwargs["timeout"] = timeout_seconds
     if max_retries is not None:
         client_kwargs["max_retries"] = max_retries
-    base_url = info["base_url"]
-    if base_url:
-        return OpenAI(base_url=base_url, api_key=api_key, **client_kwargs)
-    return OpenAI(api_key=api_key, **client_kwargs)
+    if info["base_url"]:
+        client_kwargs["base_url"] = info["base_url"]
+    return client_kwargs
+
+
+def _pool_limits() -> Any:
+    return httpx.Limits(max_connections=20, max_keepalive_connections=10)
+
+
+def make_client(
+    provider: str,
+    timeout_seconds: float | None = None,
+    max_retries: int | None = None,
+) -> Any:
+    if OpenAI is None:
+        raise RuntimeError("Missing dependency: pip install openai")
+    kwargs = _client_kwargs(provider, timeout_seconds, max_retries)
+    if httpx is not None:
+        # 复用 keep-alive 连接省掉重复 TLS 握手；h2 可用时让请求共享多路复用连接
+        kwargs["http_client"] = httpx.Client(
+            http2=_http2_available(),
+            timeout=timeout_seconds if timeout_seconds is not None else 60,
+            limits=_pool_limits(),
+        )
+    return OpenAI(**kwargs)
+
+
+def make_async_client(
+    provider: str,
+    timeout_seconds: float | None = None,
+    max_retries: int | None = None,
+) -> Any:
+    """异步客户端：网络 I/O 期间不阻塞事件循环，适合并发调用。"""
+    if AsyncOpenAI is None:
+        raise RuntimeError("Missing dependency: pip install openai")
+    kwargs = _client_kwargs(provider, timeout_seconds, max_retries)
+    if httpx is not None:
+        kwargs["http_client"] = httpx.AsyncClient(
+            http2=_http2_available(),
+            timeout=timeout_seconds if timeout_seconds is not None else 60,
+            limits=_pool_limits(),
+        )
+    return AsyncOpenAI(**kwargs)
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import datetime as dt
+import functools
+import hashlib
+import os
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional, Tuple
 
-from .config import get_config
+from .config import as_path, get_config
 
 
 @dataclass
@@ -19,26 +22,34 @@ class ObsidianPaths:
 
     @classmethod
     def from_config(cls) -> "ObsidianPaths":
-        cfg = get_config()
-        vault_root = Path(str(cfg.get("vault_root", ""))).expanduser()
-        diary_day_root = Path(str(cfg.get("diary_day_root", ""))).expanduser()
-        backup_root = Path(str(cfg.get("backup_root", ""))).expanduser()
-        write_root = Path(str(cfg.get("write_root", ""))).expanduser()
-        tpl = cfg.get("daily_template_path")
-        daily_template_path = Path(str(tpl)).expanduser() if tpl else None
-        return cls(
-            vault_root=vault_root,
-            diary_day_root=diary_day_root,
-            backup_root=backup_root,
-            write_root=write_root,
-            daily_template_path=daily_template_path,
-        )
+        return _paths_from_config()
+
+
+@functools.lru_cache(maxsize=1)
+def _paths_from_config() -> ObsidianPaths:
+    # 配置进程内不变，五个 Path 只构建一次；测试可用 cache_clear 失效
+    cfg = get_config()
+    tpl = cfg.get("daily_template_path")
+    return ObsidianPaths(
+        vault_root=as_path(cfg.get("vault_root")),
+        diary_day_root=as_path(cfg.get("diary_day_root")),
+        backup_root=as_path(cfg.get("backup_root")),
+        write_root=as_path(cfg.get("write_root")),
+        daily_template_path=as_path(tpl) if tpl else None,
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _resolved_root(root_str: str) -> str:
+    # write_root 进程内不变；软链解析一次缓存，网络盘上 resolve 很贵
+    return os.path.realpath(root_str)
 
 
 def _is_relative_to(path: Path, root: Path) -> bool:
     try:
-        path.resolve().relative_to(root.resolve())
-        return True
+        resolved_root = _resolved_root(str(root))
+        resolved = os.path.realpath(path)
+        return resolved == resolved_root or resolved.startswith(resolved_root + os.sep)
     except Exception:
         return False
 
@@ -54,28 +65,121 @@ def _backup_path_for(path: Path, backup_root: Path) -> Path:
     return backup_root / f"{ts}__{name}"
 
 
+def _hash_sidecar(path: Path, backup_root: Path) -> Path:
+    # 指纹放 backup_root 下，不往 vault 里丢辅助文件
+    name = hashlib.sha256(str(path).encode("utf-8")).hexdigest()[:16]
+    return backup_root / ".hashes" / f"{name}.txt"
+
+
+def _record_hash(sidecar: Path, text_hash: str, path: Path) -> None:
+    try:
+        stat = path.stat()
+        sidecar.parent.mkdir(parents=True, exist_ok=True)
+        sidecar.write_text(f"{text_hash} {stat.st_size} {stat.st_mtime_ns}", encoding="utf-8")
+    except OSError:
+        pass
+
+
+def _prepare_overwrite(
+    path: Path, text: str, text_hash: str, sidecar: Path, backup_root: Path
+) -> Tuple[bool, Optional[Path]]:
+    """判断是否需要落盘，需要覆盖旧内容时先备份。
+
+    指纹 + size/mtime 都对得上才免读；文件被外部改过就退回全文比较。
+    """
+    if not path.exists():
+        return True, None
+    stat = path.stat()
+    try:
+        recorded = sidecar.read_text(encoding="utf-8").split()
+    except OSError:
+        recorded = []
+    if recorded == [text_hash, str(stat.st_size), str(stat.st_mtime_ns)]:
+        return False, None
+    current = path.read_text(encoding="utf-8")
+    if current == text:
+        _record_hash(sidecar, text_hash, path)
+        return False, None
+    backup_root.mkdir(parents=True, exist_ok=True)
+    backup_path = _backup_path_for(path, backup_root)
+    backup_path.write_text(current, encoding="utf-8")
+    return True, backup_path
+
+
 def safe_write_text(path: Path, text: str, backup_root: Path, write_root: Path) -> Optional[Path]:
     ensure_write_allowed(path, write_root)
     path.parent.mkdir(parents=True, exist_ok=True)
-    backup_path = None
-    if path.exists():
-        current = path.read_text(encoding="utf-8")
-        if current == text:
-            return
-        backup_root.mkdir(parents=True, exist_ok=True)
-        backup_path = _backup_path_for(path, backup_root)
-        backup_path.write_text(current, encoding="utf-8")
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    sidecar = _hash_sidecar(path, backup_root)
+    should_write, backup_path = _prepare_overwrite(path, text, text_hash, sidecar, backup_root)
+    if not should_write:
+        return None
     path.write_text(text, encoding="utf-8")
+    _record_hash(sidecar, text_hash, path)
     return backup_path
 
 
-def replace_or_append_section(
-    text: str, heading: str, new_body: str, heading_level: int = 2
-) -> str:
-    pattern = re.compile(
+def _fsync_dir(dir_path: Path) -> None:
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:  # 某些文件系统不允许 open 目录，放弃屏障即可
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def safe_write_text_batch(
+    items: Iterable[Tuple[Path, str]], backup_root: Path, write_root: Path
+) -> List[Path]:
+    """批量版 safe_write_text：每篇 tmp 写入 + fsync + os.replace 原子落盘，
+    目录持久化屏障合并为每个目录一次，而不是每个文件一次。
+
+    适合 fix_week_notes 这类一次改几十篇笔记的场景；跳过/备份逻辑与
+    单写版完全一致，返回产生的备份路径列表。
+    """
+    backups: List[Path] = []
+    touched_dirs = set()
+    for path, text in items:
+        ensure_write_allowed(path, write_root)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        sidecar = _hash_sidecar(path, backup_root)
+        should_write, backup_path = _prepare_overwrite(path, text, text_hash, sidecar, backup_root)
+        if not should_write:
+            continue
+        tmp_path = path.with_name(path.name + ".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, text.encode("utf-8"))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+        _record_hash(sidecar, text_hash, path)
+        if backup_path is not None:
+            backups.append(backup_path)
+        touched_dirs.add(path.parent)
+    for dir_path in touched_dirs:
+        _fsync_dir(dir_path)
+    return backups
+
+
+@functools.lru_cache(maxsize=256)
+def _section_re(heading: str, heading_level: int) -> re.Pattern[str]:
+    # 标题集合很小且固定，按 (heading, level) 缓存编译结果，批量改日记时不重复编译
+    return re.compile(
         rf"(^{ '#' * heading_level }\s+{re.escape(heading)}\s*\n)(.*?)(?=^#{{1,{heading_level}}}\s|\Z)",
         re.DOTALL | re.MULTILINE,
     )
+
+
+def replace_or_append_section(
+    text: str, heading: str, new_body: str, heading_level: int = 2
+) -> str:
+    pattern = _section_re(heading, heading_level)
+
     def _replace(match: re.Match) -> str:
         return f"{match.group(1)}{new_body.rstrip()}\n\n"
 
@@ -92,10 +196,7 @@ def update_subsection_in_section(
     section_level: int = 2,
     subsection_level: int = 3,
 ) -> str:
-    section_pattern = re.compile(
-        rf"(^{ '#' * section_level }\s+{re.escape(section_heading)}\s*\n)(.*?)(?=^#{{1,{section_level}}}\s|\Z)",
-        re.DOTALL | re.MULTILINE,
-    )
+    section_pattern = _section_re(section_heading, section_level)
 
     def _replace(match: re.Match) -> str:
         header = match.group(1)
@@ -116,15 +217,30 @@ def update_subsection_in_section(
     return text.rstrip() + "\n\n" + section
 
 
+# 空白行（含只有空格/制表符的行）：出现任意一个就得走慢路径重建
+_BLANKISH_LINE_RE = re.compile(r"(?:\A|\n)[ \t]*\n")
+
+
 def append_list_items(existing: str, items: Iterable[str]) -> str:
+    bullets = "".join(f"- {item}\n" for item in items)
+    if not existing.strip():
+        return bullets or "\n"
+    # 已是规整列表（单个行尾换行、无空白行）时直接拼接与重建逐字节一致，
+    # 免掉整段 split/join
+    if existing.endswith("\n") and _BLANKISH_LINE_RE.search(existing) is None:
+        return existing + bullets
     lines = [line for line in existing.splitlines() if line.strip()]
-    for item in items:
-        lines.append(f"- {item}")
-    return "\n".join(lines) + "\n"
+    return "\n".join(lines) + "\n" + bullets
 
 
 FRONTMATTER_KEY_RE = re.compile(r"^([A-Za-z0-9_-]+)\s*:")
 
+# YAML 标量需要加引号的特殊字符，一次 C 级扫描代替七次 in 检查
+_SPECIAL_RE = re.compile(r"[:#{}\[\],]")
+
+# 只切出文件头部的 frontmatter 块；正文无论多大都不再逐行过手
+_FM_BLOCK_RE = re.compile(r"\A---[ \t]*\n(.*?)^---[ \t]*(\n|\Z)", re.DOTALL | re.MULTILINE)
+
 
 def _format_scalar(value: object) -> str:
     if isinstance(value, bool):
@@ -134,7 +250,7 @@ def _format_scalar(value: object) -> str:
     text = str(value)
     if text.startswith("[[") and text.endswith("]]"):
         return text
-    if any(ch in text for ch in [":", "#", "{", "}", "[", "]", ","]) or text.strip() != text:
+    if _SPECIAL_RE.search(text) is not None or text.strip() != text:
         return '"' + text.replace('"', '\\"') + '"'
     return text
 
@@ -158,42 +274,32 @@ def _format_frontmatter_lines(key: str, value: object) -> list[str]:
 def update_frontmatter(text: str, updates: dict) -> str:
     if not updates:
         return text
+    block = _FM_BLOCK_RE.match(text)
+    if block:
+        fm_lines = block.group(1).splitlines()
+        # 先一趟把键行位置标出来（每行只 strip+match 一次），再按 span 输出
+        key_spans: list[tuple[int, str]] = []
+        for idx, line in enumerate(fm_lines):
+            match = FRONTMATTER_KEY_RE.match(line.strip())
+            if match:
+                key_spans.append((idx, match.group(1)))
+        new_lines = []
+        existing = set()
+        first_key = key_spans[0][0] if key_spans else len(fm_lines)
+        new_lines.extend(fm_lines[:first_key])
+        ends = [idx for idx, _ in key_spans[1:]] + [len(fm_lines)]
+        for (start, key), end in zip(key_spans, ends):
+            if key in updates:
+                existing.add(key)
+                new_lines.extend(_format_frontmatter_lines(key, updates[key]))
+            else:
+                new_lines.extend(fm_lines[start:end])
+        for key, value in updates.items():
+            if key not in existing:
+                new_lines.extend(_format_frontmatter_lines(key, value))
+        # 正文部分原样拼回，不参与 split/join
+        return "\n".join(["---", *new_lines, "---"]) + block.group(2) + text[block.end():]
     lines = text.splitlines()
-    if lines and lines[0].strip() == "---":
-        end = None
-        for i in range(1, len(lines)):
-            if lines[i].strip() == "---":
-                end = i
-                break
-        if end is not None:
-            fm_lines = lines[1:end]
-            new_lines = []
-            existing = set()
-            i = 0
-            while i < len(fm_lines):
-                match = FRONTMATTER_KEY_RE.match(fm_lines[i].strip())
-                if match:
-                    key = match.group(1)
-                    j = i + 1
-                    while j < len(fm_lines) and not FRONTMATTER_KEY_RE.match(
-                        fm_lines[j].strip()
-                    ):
-                        j += 1
-                    if key in updates:
-                        existing.add(key)
-                        new_lines.extend(_format_frontmatter_lines(key, updates[key]))
-                    else:
-                        new_lines.extend(fm_lines[i:j])
-                    i = j
-                    continue
-                new_lines.append(fm_lines[i])
-                i += 1
-            for key, value in updates.items():
-                if key not in existing:
-                    new_lines.extend(_format_frontmatter_lines(key, value))
-            lines[1:end] = new_lines
-            updated = "\n".join(lines)
-            return updated + ("\n" if text.endswith("\n") else "")
     fm_lines = ["---"]
     for key, value in updates.items():
         fm_lines.extend(_format_frontmatter_lines(key, value))
@@ -202,28 +308,46 @@ def update_frontmatter(text: str, updates: dict) -> str:
     return updated + ("\n" if text.endswith("\n") else "")
 
 
+# Templater 令牌集合固定：编译一条字面量交替式，整个模板只扫一遍
+# （长令牌在前，避免短前缀抢先匹配）
+_TPL_TOKENS = (
+    '<% tp.date.now("YYYY-MM", 0, tp.file.title, "YYYY-[W]WW") %>',
+    '<% tp.date.now("YYYY-MM", 0, tp.file.title, "YYYY-[W]W") %>',
+    '<% tp.date.now("YYYY-[W]WW", 0, tp.file.title, "YYYY-MM-DD") %>',
+    '<% tp.date.now("YYYY-[W]W", 0, tp.file.title, "YYYY-MM-DD") %>',
+    '<% tp.date.now("YYYY", 0, tp.file.title, "YYYY-MM-DD") %>',
+    '<% tp.date.now("W", 0, tp.file.title, "YYYY-MM-DD") %>',
+    '<% tp.date.now("YYYY-[W]WW") %>',
+    '<% tp.date.now("YYYY-[W]W") %>',
+    '<% tp.date.now("YYYY-MM-DD") %>',
+    '<% tp.date.now("YYYY-MM") %>',
+    '<% tp.file.title.slice(0, 7) %>',
+    '<% tp.file.title %>',
+)
+_TPL_RE = re.compile("|".join(re.escape(token) for token in _TPL_TOKENS))
+
+
 def _render_daily_template(template_text: str, date: dt.date) -> str:
     iso = date.isocalendar()
     week = iso.week if hasattr(iso, "week") else iso[1]
-    week_id = f"{date.strftime('%Y')}-W{week}"
+    # 周 id 补零，与 ensure_weekly_file / fix_week_notes 的规范文件名一致
+    week_id = f"{date.strftime('%Y')}-W{week:02d}"
+    month = date.strftime("%Y-%m")
     replacements = {
         '<% tp.date.now("YYYY-MM-DD") %>': date.isoformat(),
-        '<% tp.date.now("YYYY-MM") %>': date.strftime("%Y-%m"),
+        '<% tp.date.now("YYYY-MM") %>': month,
         '<% tp.file.title %>': date.isoformat(),
-        '<% tp.file.title.slice(0, 7) %>': date.strftime("%Y-%m"),
+        '<% tp.file.title.slice(0, 7) %>': month,
         '<% tp.date.now("YYYY", 0, tp.file.title, "YYYY-MM-DD") %>': date.strftime("%Y"),
         '<% tp.date.now("W", 0, tp.file.title, "YYYY-MM-DD") %>': f"{week}",
         '<% tp.date.now("YYYY-[W]WW", 0, tp.file.title, "YYYY-MM-DD") %>': week_id,
         '<% tp.date.now("YYYY-[W]W", 0, tp.file.title, "YYYY-MM-DD") %>': week_id,
         '<% tp.date.now("YYYY-[W]WW") %>': week_id,
         '<% tp.date.now("YYYY-[W]W") %>': week_id,
-        '<% tp.date.now("YYYY-MM", 0, tp.file.title, "YYYY-[W]WW") %>': date.strftime("%Y-%m"),
-        '<% tp.date.now("YYYY-MM", 0, tp.file.title, "YYYY-[W]W") %>': date.strftime("%Y-%m"),
+        '<% tp.date.now("YYYY-MM", 0, tp.file.title, "YYYY-[W]WW") %>': month,
+        '<% tp.date.now("YYYY-MM", 0, tp.file.title, "YYYY-[W]W") %>': month,
     }
-    rendered = template_text
-    for token, value in replacements.items():
-        rendered = rendered.replace(token, value)
-    return rendered
+    return _TPL_RE.sub(lambda m: replacements[m.group(0)], template_text)
 
 
 def render_template(template_text: str, date: dt.date) -> str:
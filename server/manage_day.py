@@ -12,20 +12,16 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
+import functools
+import hashlib
+import logging
 import re
 import sys
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from core import (
-    advisor,
-    goal_manager,
-    journal_analyzer,
-    llm_analyzer,
-    record_store,
-    state_analytics,
-    state_recorder,
-)
+# core.* 及其连带的 LLM SDK 都按需在函数内导入：
+# 纯 ensure 日记文件的 CLI 调用不必付这笔冷启动成本
 from integrations.obsidian import (
     ObsidianPaths,
     append_list_items,
@@ -38,23 +34,144 @@ from integrations.obsidian import (
 )
 from integrations.config import get_config
 
+logger = logging.getLogger(__name__)
+
 OBSIDIAN_PATHS = ObsidianPaths.from_config()
-SECTION_RE_CACHE: Dict[str, re.Pattern[str]] = {}
 LEGACY_WEEKLY_MARKER_START = "<!-- AUTO:weekly-tasks:start -->"
 LEGACY_WEEKLY_MARKER_END = "<!-- AUTO:weekly-tasks:end -->"
+
+# 旧版周计划标记行一条 sub 清掉，不必 splitlines 重建整段
+_LEGACY_MARKER_RE = re.compile(
+    rf"^[ \t]*(?:{re.escape(LEGACY_WEEKLY_MARKER_START)}|{re.escape(LEGACY_WEEKLY_MARKER_END)})[ \t]*(?:\n|\Z)",
+    re.MULTILINE,
+)
+
+# 任务行 '- [ ] xxx'；容忍行首缩进，MULTILINE 直接在整段正文上 finditer
+# （复选框后用 [ \t]+ 而非 \s+：多行模式下 \s 会吞换行、把下一行卷进捕获组）
+_TASK_RE = re.compile(r"^[ \t]*- \[[ xX]\][ \t]+(.*)$", re.MULTILINE)
 JOURNAL_SECTION_HEADING = "Journal"
 GTD_SECTION_HEADING = "GTD"
 GTD_TODAY_HEADING = "Today's Tasks"
 
 
+# path -> (st_mtime_ns, text)：同一次流程里反复碰同一篇日记时只读一次盘
+_FILE_CACHE: Dict[Path, tuple[int, str]] = {}
+
+
+def read_cached(path: Path) -> str:
+    """读文件内容，mtime 没变就直接还缓存，免掉重复的 open/read 往返。"""
+    mtime = path.stat().st_mtime_ns
+    cached = _FILE_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    text = path.read_text(encoding="utf-8")
+    _FILE_CACHE[path] = (mtime, text)
+    return text
+
+
+def _remember_written(path: Path, text: str) -> None:
+    """写盘后用新内容回填缓存，下次 read_cached 不再落盘。"""
+    try:
+        _FILE_CACHE[path] = (path.stat().st_mtime_ns, text)
+    except OSError:
+        _FILE_CACHE.pop(path, None)
+
+
+def _compile_section_pattern(heading: str, level: int) -> re.Pattern[str]:
+    return re.compile(
+        rf"(^{ '#' * level }\s+{re.escape(heading)}\s*\n)(.*?)(?=^#{{1,{level}}}\s|\Z)",
+        re.DOTALL | re.MULTILINE,
+    )
+
+
+# 这里用到的标题集合小而固定，导入时一次编译完；运行期 _section_pattern 只剩一次 dict 取值
+_SECTION_PATTERNS: Dict[tuple[int, str], re.Pattern[str]] = {
+    (level, heading): _compile_section_pattern(heading, level)
+    for heading, level in (
+        ("Status", 2),
+        ("Today's Tasks", 2),
+        ("Today's Advice", 2),
+        ("Evening Summary", 2),
+        ("Evening Advice", 2),
+        (JOURNAL_SECTION_HEADING, 2),
+        (GTD_SECTION_HEADING, 1),
+        (GTD_TODAY_HEADING, 2),
+        ("Device Data", 3),
+        ("Weekly Tasks", 1),
+        ("Weekly Tasks", 2),
+        ("Weekly Tasks", 3),
+    )
+}
+
+
 def _section_pattern(heading: str, level: int = 2) -> re.Pattern[str]:
-    key = f"{level}:{heading}"
-    if key not in SECTION_RE_CACHE:
-        SECTION_RE_CACHE[key] = re.compile(
-            rf"(^{ '#' * level }\s+{re.escape(heading)}\s*\n)(.*?)(?=^#{{1,{level}}}\s|\Z)",
-            re.DOTALL | re.MULTILINE,
-        )
-    return SECTION_RE_CACHE[key]
+    pattern = _SECTION_PATTERNS.get((level, heading))
+    if pattern is None:
+        # 非常规标题（调用方自定义 subsection 等）兜底编译一次后进表
+        pattern = _SECTION_PATTERNS[(level, heading)] = _compile_section_pattern(heading, level)
+    return pattern
+
+
+class _MarkdownSections:
+    """单趟扫描建 (level, heading) -> 正文跨度表，代替逐标题的全文正则回扫。
+
+    语义对齐 _section_pattern：正文从标题行换行后开始，到下一个级别
+    <= 自身的标题（或文末）为止；同名标题取第一次出现。
+    """
+
+    __slots__ = ("text", "spans")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        spans: Dict[tuple[int, str], tuple[int, int]] = {}
+        open_stack: List[tuple[int, tuple[int, str], int]] = []
+        offset = 0
+        for line in text.splitlines(keepends=True):
+            if line.startswith("#"):
+                level = len(line) - len(line.lstrip("#"))
+                rest = line[level:]
+                if rest[:1] in (" ", "\t"):
+                    while open_stack and open_stack[-1][0] >= level:
+                        _, key, start = open_stack.pop()
+                        spans.setdefault(key, (start, offset))
+                    heading = rest.strip()
+                    # 正则里 \s*\n 会吞掉标题后的空行，这里同样把正文起点推过空白段
+                    start = offset + len(line)
+                    j = start
+                    n = len(text)
+                    while j < n and text[j] in " \t\r\n":
+                        j += 1
+                    last_nl = text.rfind("\n", start, j)
+                    if last_nl != -1:
+                        start = last_nl + 1
+                    open_stack.append((level, (level, heading), start))
+            offset += len(line)
+        end = len(text)
+        for _, key, start in open_stack:
+            spans.setdefault(key, (start, end))
+        self.spans = spans
+
+    def body(self, heading: str, level: int = 2) -> Optional[str]:
+        span = self.spans.get((level, heading))
+        if span is None:
+            return None
+        return self.text[span[0] : span[1]]
+
+
+# 近期解析结果按文本身份留 4 份：同一文本版本反复取不同 section 时零重扫
+_SECTIONS_CACHE: List[tuple[str, _MarkdownSections]] = []
+
+
+def _sections(text: str) -> _MarkdownSections:
+    for i, (cached_text, parsed) in enumerate(_SECTIONS_CACHE):
+        if cached_text is text:
+            if i:
+                _SECTIONS_CACHE.insert(0, _SECTIONS_CACHE.pop(i))
+            return parsed
+    parsed = _MarkdownSections(text)
+    _SECTIONS_CACHE.insert(0, (text, parsed))
+    del _SECTIONS_CACHE[4:]
+    return parsed
 
 
 def ensure_daily_file(date: dt.date) -> Path:
@@ -62,6 +179,9 @@ def ensure_daily_file(date: dt.date) -> Path:
     return obsidian_ensure_daily_file(date, OBSIDIAN_PATHS)
 
 
+# 配置在进程内稳定（ObsidianPaths.from_config 同理已在 obsidian 里缓存），
+# 周目录解析一次即可；若运行期重载配置需配合 _get_week_paths.cache_clear()
+@functools.lru_cache(maxsize=1)
 def _get_week_paths() -> tuple[Optional[Path], Optional[Path], Optional[Path]]:
     cfg = get_config()
     week_root_value = cfg.get("diary_week_root")
@@ -80,16 +200,15 @@ def ensure_weekly_file(date: dt.date) -> Optional[Path]:
     if not week_root:
         return None
     week_root.mkdir(parents=True, exist_ok=True)
+    # Python 3.9+ 的 isocalendar() 是具名元组，直接取字段，不再 hasattr 探测
     iso = date.isocalendar()
-    iso_year = iso.year if hasattr(iso, "year") else iso[0]
-    iso_week = iso.week if hasattr(iso, "week") else iso[1]
-    week_id = f"{iso_year}-W{iso_week}"
+    week_id = f"{iso.year}-W{iso.week:02d}"
     path = week_root / f"{week_id}.md"
     if path.exists():
         return path
-    legacy_week_id = f"{iso_year}-W{iso_week:02d}"
-    legacy_path = week_root / f"{legacy_week_id}.md"
-    if legacy_path.exists():
+    # 旧文件可能是未补零的命名；只有 W1-W9 才会与规范名不同
+    legacy_path = week_root / f"{iso.year}-W{iso.week}.md"
+    if legacy_path != path and legacy_path.exists():
         return legacy_path
     template_text = None
     if template_path and template_path.exists():
@@ -104,9 +223,60 @@ def ensure_weekly_file(date: dt.date) -> Optional[Path]:
             "# Weekly Tasks\n"
         )
     safe_write_text(path, template_text, OBSIDIAN_PATHS.backup_root, write_root)
+    _remember_written(path, template_text)
     return path
 
 
+class DailyEditSession:
+    """把同一篇日记的多处 section/frontmatter 改动攒在内存里，退出时一次写盘。
+
+    morning/evening 流程里 OCR、任务、建议各写各的会触发多次备份+写入；
+    session 内所有编辑只动内存串，__exit__ 时有变化才落一次 safe_write_text。
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.text = read_cached(path)
+        self._original = self.text
+
+    def replace_section(self, heading: str, body: str, level: int = 2) -> None:
+        self.text = replace_or_append_section(self.text, heading, body, heading_level=level)
+
+    def update_subsection(
+        self,
+        section_heading: str,
+        subsection_heading: str,
+        body: str,
+        section_level: int = 2,
+        subsection_level: int = 3,
+    ) -> None:
+        self.text = update_subsection_in_section(
+            self.text,
+            section_heading,
+            subsection_heading,
+            body,
+            section_level=section_level,
+            subsection_level=subsection_level,
+        )
+
+    def update_frontmatter(self, updates: Dict[str, object]) -> None:
+        self.text = update_frontmatter(self.text, updates)
+
+    def flush(self) -> None:
+        backup_path = safe_write_text(self.path, self.text, OBSIDIAN_PATHS.backup_root, OBSIDIAN_PATHS.write_root)
+        _remember_written(self.path, self.text)
+        self._original = self.text
+        if backup_path:
+            logger.info("backup %s", backup_path)
+
+    def __enter__(self) -> "DailyEditSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None and self.text != self._original:
+            self.flush()
+
+
 def call_gpt_ocr(image_paths: List[Path]) -> Dict[str, str]:
     """Stub for OCR via GPT-5. Fill in with your API call."""
     # TODO: Implement GPT-5 vision call here. Return key/value metrics.
@@ -132,92 +302,89 @@ def format_state_block(
     return "\n".join(parts) + "\n"
 
 
+# 缺数据统一画横线；做成常量省掉每个字段一次 _format_minutes(None) 调用
+_NO_VALUE = "-"
+
+
 def _format_minutes(minutes: Optional[int]) -> str:
     if minutes is None:
-        return "-"
+        return _NO_VALUE
     hours = minutes // 60
     mins = minutes % 60
     return f"{hours}:{mins:02d}"
 
 
+def _format_app_entries(entries: object) -> str:
+    """top_apps/night_top_apps 共用：一趟生成器拼出 'App 1:23 / App2' 形式。"""
+    bits = []
+    for entry in entries or []:
+        if not isinstance(entry, dict):
+            continue
+        name = entry.get("name")
+        minutes = entry.get("minutes")
+        if name and minutes is not None:
+            bits.append(f"{name} {_format_minutes(int(minutes))}")
+        elif name:
+            bits.append(name)
+    return " / ".join(bits) if bits else _NO_VALUE
+
+
 def format_device_data_block(normalized: Dict[str, object]) -> str:
     phone = normalized.get("phone_usage") or {}
     sleep = normalized.get("sleep") or {}
-    lines = []
 
-    sleep_bits = []
     total = sleep.get("total_minutes")
-    if total is not None:
-        sleep_bits.append(f"Total {_format_minutes(total)}")
     deep = sleep.get("deep_minutes")
-    if deep is not None:
-        sleep_bits.append(f"Deep {_format_minutes(deep)}")
     rem = sleep.get("rem_minutes")
-    if rem is not None:
-        sleep_bits.append(f"REM {_format_minutes(rem)}")
     score = sleep.get("score")
-    if score is not None:
-        sleep_bits.append(f"Score {score}")
-    lines.append(f"- Sleep: {' '.join(sleep_bits) if sleep_bits else '-'}")
+    sleep_bits = " ".join(
+        filter(
+            None,
+            (
+                f"Total {_format_minutes(total)}" if total is not None else None,
+                f"Deep {_format_minutes(deep)}" if deep is not None else None,
+                f"REM {_format_minutes(rem)}" if rem is not None else None,
+                f"Score {score}" if score is not None else None,
+            ),
+        )
+    )
 
     screen_minutes = phone.get("screen_time_minutes")
-    lines.append(f"- Screen Time: {_format_minutes(screen_minutes) if screen_minutes is not None else '-'}")
-
     night_minutes = phone.get("night_screen_minutes")
-    lines.append(f"- Night Screen: {_format_minutes(night_minutes) if night_minutes is not None else '-'}")
-
     unlock_count = phone.get("unlock_count")
-    lines.append(f"- Unlocks: {unlock_count if unlock_count is not None else '-'}")
-
-    apps = phone.get("top_apps") or []
-    app_bits = []
-    for entry in apps:
-        if not isinstance(entry, dict):
-            continue
-        name = entry.get("name")
-        minutes = entry.get("minutes")
-        if name and minutes is not None:
-            app_bits.append(f"{name} {_format_minutes(int(minutes))}")
-        elif name:
-            app_bits.append(name)
-    lines.append(f"- Top Apps: {' / '.join(app_bits) if app_bits else '-'}")
-
-    night_apps = phone.get("night_top_apps") or []
-    night_bits = []
-    for entry in night_apps:
-        if not isinstance(entry, dict):
-            continue
-        name = entry.get("name")
-        minutes = entry.get("minutes")
-        if name and minutes is not None:
-            night_bits.append(f"{name} {_format_minutes(int(minutes))}")
-        elif name:
-            night_bits.append(name)
-    lines.append(f"- Night Apps: {' / '.join(night_bits) if night_bits else '-'}")
-
     hrv = normalized.get("hrv_ms")
-    lines.append(f"- HRV: {hrv if hrv is not None else '-'}")
     resting = normalized.get("resting_bpm")
-    lines.append(f"- Resting HR: {resting if resting is not None else '-'}")
     spo2 = normalized.get("spo2_percent")
-    lines.append(f"- SpO2: {spo2 if spo2 is not None else '-'}")
     stress = normalized.get("stress_level")
-    lines.append(f"- Stress: {stress if stress is not None else '-'}")
 
+    lines = [
+        f"- Sleep: {sleep_bits or _NO_VALUE}",
+        f"- Screen Time: {_format_minutes(screen_minutes) if screen_minutes is not None else _NO_VALUE}",
+        f"- Night Screen: {_format_minutes(night_minutes) if night_minutes is not None else _NO_VALUE}",
+        f"- Unlocks: {unlock_count if unlock_count is not None else _NO_VALUE}",
+        f"- Top Apps: {_format_app_entries(phone.get('top_apps'))}",
+        f"- Night Apps: {_format_app_entries(phone.get('night_top_apps'))}",
+        f"- HRV: {hrv if hrv is not None else _NO_VALUE}",
+        f"- Resting HR: {resting if resting is not None else _NO_VALUE}",
+        f"- SpO2: {spo2 if spo2 is not None else _NO_VALUE}",
+        f"- Stress: {stress if stress is not None else _NO_VALUE}",
+    ]
     return "\n".join(lines) + "\n"
 
 
-def update_device_data(path: Path, normalized: Dict[str, object]) -> None:
-    text = path.read_text(encoding="utf-8")
-    device_body = format_device_data_block(normalized)
-    text = update_subsection_in_section(text, "Status", "Device Data", device_body)
-    backup_path = safe_write_text(path, text, OBSIDIAN_PATHS.backup_root, OBSIDIAN_PATHS.write_root)
-    if backup_path:
-        print(f"[backup] {backup_path}")
+def update_device_data(
+    path: Path, normalized: Dict[str, object], session: Optional[DailyEditSession] = None
+) -> None:
+    own = session or DailyEditSession(path)
+    own.update_subsection("Status", "Device Data", format_device_data_block(normalized))
+    if session is None:
+        own.flush()
 
 
 def generate_todo_suggestions(goal_text: Optional[str], text_input: Optional[str]) -> List[str]:
     """Generate actionable items from local goals/projects, fallback to generic hints."""
+    from core import advisor, goal_manager
+
     try:
         graph = goal_manager.build_goal_graph()
         goal_manager.save_goal_graph(graph)
@@ -238,6 +405,8 @@ def generate_todo_suggestions(goal_text: Optional[str], text_input: Optional[str
 
 def generate_advice_suggestions(date: dt.date, text_input: Optional[str]) -> List[str]:
     """Generate softer advice based on recent state and stored metrics."""
+    from core import advisor, state_analytics, state_recorder
+
     try:
         state = state_recorder.load_daily_state(date)
         trends = state_analytics.summarize_multi_windows(date)
@@ -248,6 +417,8 @@ def generate_advice_suggestions(date: dt.date, text_input: Optional[str]) -> Lis
 
 def generate_evening_advice(date: dt.date, text_input: Optional[str]) -> List[str]:
     """Generate evening advice (fallback) based on state + text."""
+    from core import advisor, state_analytics, state_recorder
+
     try:
         state = state_recorder.load_daily_state(date)
         trends = state_analytics.summarize_multi_windows(date)
@@ -261,6 +432,7 @@ def generate_tomorrow_tasks(graph: Optional[Dict[str, object]], limit: int = 3)
     """Generate next-day tasks (fallback) from active goals/projects."""
     if not graph:
         return ["Write down the 3 most important things for tomorrow"]
+    from core import advisor
     suggestions = advisor.generate_daily_actions(graph, limit=limit)
     return suggestions if suggestions else ["Write down the 3 most important things for tomorrow"]
 
@@ -275,11 +447,8 @@ def _parse_date(date_str: Optional[str]) -> Optional[dt.date]:
 
 
 def _extract_section_body(text: str, heading: str, level: int = 2) -> str:
-    pattern = _section_pattern(heading, level)
-    match = pattern.search(text)
-    if not match:
-        return ""
-    return match.group(2).rstrip()
+    body = _sections(text).body(heading, level)
+    return body.rstrip() if body else ""
 
 
 def _extract_subsection_body(
@@ -289,13 +458,30 @@ def _extract_subsection_body(
     section_level: int = 2,
     subsection_level: int = 3,
 ) -> str:
-    section_match = _section_pattern(section_heading, section_level).search(text)
-    if not section_match:
+    # 子标题只在所属 section 的正文里找，和原先的嵌套 search 语义一致
+    section_body = _sections(text).body(section_heading, section_level)
+    if not section_body:
         return ""
-    section_body = section_match.group(2)
     return _extract_section_body(section_body, subsection_heading, subsection_level)
 
 
+def _extract_and_replace_section(text: str, heading: str, transformer, level: int = 2) -> str:
+    """抽取正文、变换、写回合成一趟 subn；标题不存在时退回 append 路径。
+
+    transformer 拿到 rstrip 过的旧正文，返回新正文，和原先
+    _extract_section_body + replace_or_append_section 两步的字节输出一致。
+    """
+    pattern = _section_pattern(heading, level)
+    new_text, count = pattern.subn(
+        lambda m: f"{m.group(1)}{transformer(m.group(2).rstrip()).rstrip()}\n\n",
+        text,
+        count=1,
+    )
+    if count:
+        return new_text
+    return replace_or_append_section(text, heading, transformer(""), heading_level=level)
+
+
 def _append_subsection_item(
     text: str,
     section_heading: str,
@@ -321,17 +507,17 @@ def append_journal_entry(
     subsection_heading: str,
     content: str,
     timestamp: Optional[dt.datetime] = None,
+    session: Optional[DailyEditSession] = None,
 ) -> None:
     cleaned = content.strip()
     if not cleaned:
         return
     stamp = (timestamp or dt.datetime.now()).strftime("%H:%M")
     entry = f"[{stamp}] {cleaned}"
-    text = path.read_text(encoding="utf-8")
-    text = _append_subsection_item(text, JOURNAL_SECTION_HEADING, subsection_heading, entry)
-    backup_path = safe_write_text(path, text, OBSIDIAN_PATHS.backup_root, OBSIDIAN_PATHS.write_root)
-    if backup_path:
-        print(f"[backup] {backup_path}")
+    own = session or DailyEditSession(path)
+    own.text = _append_subsection_item(own.text, JOURNAL_SECTION_HEADING, subsection_heading, entry)
+    if session is None:
+        own.flush()
 
 
 def append_gtd_tasks(
@@ -339,73 +525,75 @@ def append_gtd_tasks(
     tasks: List[str],
     section_heading: str = GTD_SECTION_HEADING,
     subsection_heading: str = GTD_TODAY_HEADING,
+    session: Optional[DailyEditSession] = None,
 ) -> None:
     normalized = _normalize_tasks(tasks)
     if not normalized:
         return
-    text = path.read_text(encoding="utf-8")
+    own = session or DailyEditSession(path)
     existing_body = _extract_subsection_body(
-        text,
+        own.text,
         section_heading,
         subsection_heading,
         section_level=1,
         subsection_level=2,
     )
     merged_body = _merge_task_body(existing_body, normalized)
-    text = update_subsection_in_section(
-        text,
+    own.update_subsection(
         section_heading,
         subsection_heading,
         merged_body,
         section_level=1,
         subsection_level=2,
     )
-    backup_path = safe_write_text(path, text, OBSIDIAN_PATHS.backup_root, OBSIDIAN_PATHS.write_root)
-    if backup_path:
-        print(f"[backup] {backup_path}")
+    if session is None:
+        own.flush()
+
+
+def _render_list(items) -> str:
+    """从零渲染一个列表正文；等价 append_list_items(\"\", items)，少一次函数往返。"""
+    return "".join(f"- {item}\n" for item in items) or "\n"
 
 
 def _merge_task_body(existing_body: str, tasks: List[str]) -> str:
     if not tasks:
         return existing_body
-    task_re = re.compile(r"^- \[[ xX]\]\s+(.*)$")
-    existing_labels = set()
-    for line in existing_body.splitlines():
-        match = task_re.match(line.strip())
-        if match:
-            existing_labels.add(match.group(1).strip())
+    existing_labels = {match.group(1).strip() for match in _TASK_RE.finditer(existing_body)}
     new_items = [t.strip() for t in tasks if t and t.strip() and t.strip() not in existing_labels]
     if not new_items:
         return existing_body
-    append_body = append_list_items("", [f"[ ] {t}" for t in new_items]).rstrip()
+    append_body = _render_list(f"[ ] {t}" for t in new_items).rstrip()
     if existing_body.strip():
         return existing_body.rstrip() + "\n" + append_body + "\n"
     return append_body + "\n"
 
 
+@functools.lru_cache(maxsize=32)
+def _heading_level_re(heading: str) -> re.Pattern[str]:
+    return re.compile(rf"^(#{{1,3}})[ \t]+{re.escape(heading)}[ \t]*$", re.MULTILINE)
+
+
 def _detect_heading_level(text: str, heading: str) -> int:
-    for level in (1, 2, 3):
-        if _section_pattern(heading, level).search(text):
-            return level
-    return 1
+    # 一趟扫描收齐所有层级，取最浅的——与原先按 1/2/3 逐层 search 的偏好一致
+    levels = [len(m.group(1)) for m in _heading_level_re(heading).finditer(text)]
+    return min(levels) if levels else 1
 
 
 def _normalize_tasks(items: List[str]) -> List[str]:
-    normalized = []
-    seen = set()
-    for item in items:
-        if not item or not isinstance(item, str):
-            continue
-        text = item.strip()
-        if not text:
-            continue
-        if text.startswith("- ["):
-            text = text.split("]", 1)[-1].strip()
-        if text in seen:
-            continue
-        seen.add(text)
-        normalized.append(text)
-    return normalized
+    # dict.fromkeys 在 C 层去重且保序，省掉 seen 集合 + 逐项 append 的双份结构
+    def gen():
+        for item in items:
+            if not item or not isinstance(item, str):
+                continue
+            text = item.strip()
+            if not text:
+                continue
+            if text.startswith("- ["):
+                text = text.split("]", 1)[-1].strip()
+            if text:
+                yield text
+
+    return list(dict.fromkeys(gen()))
 
 
 def _normalize_weekly_plan(value: object) -> List[Dict[str, List[str]]]:
@@ -426,45 +614,47 @@ def _normalize_weekly_plan(value: object) -> List[Dict[str, List[str]]]:
     return []
 
 
-def _project_label(project: Dict[str, object]) -> Optional[str]:
-    name = project.get("name")
-    if not isinstance(name, str) or not name.strip():
-        return None
-    target = project.get("target")
-    if isinstance(target, str) and target.strip():
-        return f"{name.strip()} ({target.strip()})"
-    return name.strip()
+# advisor.DONE_STATUSES 本就是小写集合，首次用到时冻结一份（advisor 按需加载）
+@functools.lru_cache(maxsize=1)
+def _done_statuses() -> frozenset:
+    from core import advisor
 
-
-def _project_task_ref(project: Dict[str, object]) -> Optional[str]:
-    name = project.get("id") or project.get("name")
-    if not isinstance(name, str) or not name.strip():
-        return None
-    target = project.get("target")
-    text = f"#project [[{name.strip()}]]"
-    if isinstance(target, str) and target.strip():
-        text += f" {target.strip()}"
-    return text
+    return frozenset(advisor.DONE_STATUSES)
 
 
 def _projects_by_goal(graph: Optional[Dict[str, object]]) -> Dict[str, List[Dict[str, str]]]:
+    done_statuses = _done_statuses()
     goals = (graph or {}).get("goals") or []
     projects = (graph or {}).get("projects") or []
-    valid_goals = {g.get("name") for g in goals if isinstance(g.get("name"), str)}
+    valid_goals = frozenset(g.get("name") for g in goals if isinstance(g.get("name"), str))
     mapping: Dict[str, List[Dict[str, str]]] = {}
     for project in projects:
-        status = str(project.get("status", "")).lower()
-        if status in advisor.DONE_STATUSES:
+        # name/target/status 各取一次，label 与 task 引用就地拼出来，
+        # 不再经 _project_label/_project_task_ref 重复 get+strip
+        status = project.get("status")
+        status_key = status.lower() if type(status) is str else str(status or "").lower()
+        if status_key in done_statuses:
             continue
         goal = project.get("goal")
         if goal not in valid_goals:
             continue
-        label = _project_label(project)
-        task_ref = _project_task_ref(project)
         name = project.get("name")
-        if not label or not task_ref or not isinstance(name, str):
+        if not isinstance(name, str) or not name.strip():
             continue
-        mapping.setdefault(goal, []).append(
+        target = project.get("target")
+        target_text = target.strip() if isinstance(target, str) else ""
+        name_text = name.strip()
+        label = f"{name_text} ({target_text})" if target_text else name_text
+        ref_name = project.get("id") or name
+        if not isinstance(ref_name, str) or not ref_name.strip():
+            continue
+        task_ref = f"#project [[{ref_name.strip()}]]"
+        if target_text:
+            task_ref += f" {target_text}"
+        bucket = mapping.get(goal)
+        if bucket is None:
+            bucket = mapping[goal] = []
+        bucket.append(
             {
                 "id": project.get("id"),
                 "name": name,
@@ -536,22 +726,32 @@ def render_weekly_tasks(plan: List[Dict[str, List[str]]]) -> str:
 
 
 def _strip_legacy_weekly_markers(body: str) -> str:
-    cleaned = []
-    for line in body.splitlines():
-        if line.strip() in {LEGACY_WEEKLY_MARKER_START, LEGACY_WEEKLY_MARKER_END}:
-            continue
-        cleaned.append(line)
-    return "\n".join(cleaned).rstrip()
+    return _LEGACY_MARKER_RE.sub("", body).rstrip()
+
+
+# frontmatter 块和其中的 weekly_tasks_hash 行，轻量探测用
+_FM_SCAN_RE = re.compile(r"\A---[ \t]*\n(.*?)^---", re.DOTALL | re.MULTILINE)
+_WEEK_HASH_RE = re.compile(r"^weekly_tasks_hash:[ \t]*([0-9a-f]+)[ \t]*$", re.MULTILINE)
 
 
 def _upsert_weekly_tasks_section(text: str, plan: List[Dict[str, List[str]]]) -> str:
     heading = "Weekly Tasks"
+    content = _render_weekly_tasks(plan).rstrip()
+    new_hash = None
+    if content:
+        # 渲染结果没变（frontmatter 里的哈希一致）就原样返回，整个重写+写盘都省掉
+        new_hash = hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+        fm = _FM_SCAN_RE.match(text)
+        if fm:
+            old = _WEEK_HASH_RE.search(fm.group(1))
+            if old and old.group(1) == new_hash:
+                return text
     level = _detect_heading_level(text, heading)
     body = _extract_section_body(text, heading, level)
     cleaned_body = _strip_legacy_weekly_markers(body)
-    content = _render_weekly_tasks(plan).rstrip()
     if content:
         updated_body = content + "\n"
+        text = update_frontmatter(text, {"weekly_tasks_hash": new_hash})
     elif cleaned_body.strip():
         updated_body = cleaned_body.rstrip() + "\n"
     else:
@@ -567,48 +767,45 @@ def _normalize_list(value: object) -> List[str]:
     return []
 
 
+# linked_projects 清洗用的小正则，模块级编译一次
+_BULLET_RE = re.compile(r"^[-*]\s+")
+_COMMA_SPLIT_RE = re.compile(r"[，,]")
+
+
+def _clean_linked_line(line: str) -> str:
+    return _BULLET_RE.sub("", line.strip()).strip()
+
+
 def _normalize_linked_projects(value: object) -> Optional[List[str]]:
     if value is None:
         return None
     items: List[str] = []
-
-    def add_text(text: str) -> None:
-        cleaned = text.strip()
-        if not cleaned:
-            return
-        if "\n" in cleaned:
-            for line in cleaned.splitlines():
-                add_text(line)
-            return
-        cleaned = re.sub(r"^[-*]\s+", "", cleaned).strip()
-        if not cleaned:
-            return
-        if ("[[" in cleaned or "]]" in cleaned) and ("," in cleaned or "，" in cleaned):
-            parts = [p.strip() for p in re.split(r"[，,]", cleaned) if p.strip()]
-            if len(parts) > 1:
-                for part in parts:
-                    add_text(part)
-                return
-        items.append(cleaned)
-
-    def visit(val: object) -> None:
-        if isinstance(val, list):
-            for entry in val:
-                visit(entry)
-        elif isinstance(val, str):
-            add_text(val)
-
-    visit(value)
+    # 显式工作栈代替 visit/add_text 的相互递归；倒序入栈保持原有顺序
+    stack: List[object] = [value]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, list):
+            stack.extend(reversed(current))
+            continue
+        if not isinstance(current, str):
+            continue
+        for line in current.splitlines():
+            cleaned = _clean_linked_line(line)
+            if not cleaned:
+                continue
+            if ("[[" in cleaned or "]]" in cleaned) and ("," in cleaned or "，" in cleaned):
+                parts = [
+                    part
+                    for part in (_clean_linked_line(p) for p in _COMMA_SPLIT_RE.split(cleaned))
+                    if part
+                ]
+                if len(parts) > 1:
+                    items.extend(parts)
+                    continue
+            items.append(cleaned)
     if not items:
         return None
-    seen = set()
-    normalized: List[str] = []
-    for item in items:
-        if item in seen:
-            continue
-        seen.add(item)
-        normalized.append(item)
-    return normalized
+    return list(dict.fromkeys(items))
 
 
 def run_morning(
@@ -617,10 +814,12 @@ def run_morning(
     image_paths: List[Path],
     text_input: Optional[str] = None,
 ) -> None:
-    text = path.read_text(encoding="utf-8")
+    from core import goal_manager, llm_analyzer, state_analytics, state_recorder
+
+    session = DailyEditSession(path)
     ocr_metrics = call_gpt_ocr(image_paths)
     state_block = format_state_block(ocr_metrics, text_input)
-    text = replace_or_append_section(text, "Status", state_block)
+    session.replace_section("Status", state_block)
 
     date = dt.date.fromisoformat(path.stem)
     llm_result = None
@@ -642,11 +841,11 @@ def run_morning(
     if llm_result and isinstance(llm_result.get("tasks"), list):
         todos = [t for t in llm_result.get("tasks") if isinstance(t, str)]
     else:
-        print("[llm_fallback] morning tasks -> rule")
+        logger.info("llm_fallback: morning tasks -> rule")
         todos = generate_todo_suggestions(goal_text, text_input)
 
-    todo_body = append_list_items("", [f"[ ] {t}" for t in todos])
-    text = replace_or_append_section(text, "Today's Tasks", todo_body)
+    todo_body = _render_list(f"[ ] {t}" for t in todos)
+    session.replace_section("Today's Tasks", todo_body)
 
     if llm_result and isinstance(llm_result.get("advice"), list):
         advice = [a for a in llm_result.get("advice") if isinstance(a, str)]
@@ -654,19 +853,19 @@ def run_morning(
         if align_note:
             advice.append(f"Alignment: {align_note}")
     else:
-        print("[llm_fallback] morning advice -> rule")
+        logger.info("llm_fallback: morning advice -> rule")
         advice = generate_advice_suggestions(date, text_input)
 
-    advice_body = append_list_items("", advice)
-    text = replace_or_append_section(text, "Today's Advice", advice_body)
+    advice_body = _render_list(advice)
+    session.replace_section("Today's Advice", advice_body)
 
-    backup_path = safe_write_text(path, text, OBSIDIAN_PATHS.backup_root, OBSIDIAN_PATHS.write_root)
-    if backup_path:
-        print(f"[backup] {backup_path}")
+    session.flush()
 
 
 def run_evening(path: Path, journal: Optional[str]) -> None:
-    text = path.read_text(encoding="utf-8")
+    from core import goal_manager, journal_analyzer, llm_analyzer, record_store
+
+    session = DailyEditSession(path)
 
     if journal:
         analysis = {}
@@ -711,11 +910,10 @@ def run_evening(path: Path, journal: Optional[str]) -> None:
             tomorrow_tasks = _normalize_list(llm_result.get("tomorrow_tasks"))
             weekly_plan = _normalize_weekly_plan(llm_result.get("weekly_plan"))
         else:
-            print("[llm_fallback] evening summary -> rule")
+            logger.info("llm_fallback: evening summary -> rule")
             reflection = None
+            # 目标图上面已经建过一次（失败则为 None），直接复用，省掉重建+落盘
             try:
-                graph = goal_manager.build_goal_graph()
-                goal_manager.save_goal_graph(graph)
                 analysis = journal_analyzer.analyze_journal(journal, graph, extra_texts=record_texts)
             except Exception:
                 analysis = journal_analyzer.analyze_journal(journal, None, extra_texts=record_texts)
@@ -728,13 +926,12 @@ def run_evening(path: Path, journal: Optional[str]) -> None:
             analysis["topics"] = [topics]
         linked = _normalize_linked_projects(analysis.get("linked_projects"))
         analysis["linked_projects"] = linked
-        text = update_frontmatter(
-            text,
+        session.update_frontmatter(
             {
                 "mood": analysis.get("mood"),
                 "topics": analysis.get("topics"),
                 "linked_projects": analysis.get("linked_projects"),
-            },
+            }
         )
         summary_body = journal_analyzer.format_evening_summary(
             journal,
@@ -742,49 +939,83 @@ def run_evening(path: Path, journal: Optional[str]) -> None:
             records=record_texts,
             reflection=reflection,
         )
-        text = replace_or_append_section(text, "Evening Summary", summary_body)
+        session.replace_section("Evening Summary", summary_body)
 
         if not advice:
             advice = generate_evening_advice(record_date, combined_text)
-        advice_body = append_list_items("", advice)
-        text = replace_or_append_section(text, "Evening Advice", advice_body)
+        advice_body = _render_list(advice)
+        session.replace_section("Evening Advice", advice_body)
 
         if not tomorrow_tasks:
             tomorrow_tasks = generate_tomorrow_tasks(graph, limit=3)
+        # 清洗去重放在碰盘之前；清洗后为空就连明日文件都不创建
+        tomorrow_tasks = _normalize_tasks(tomorrow_tasks)
         if tomorrow_tasks:
             tomorrow_date = record_date + dt.timedelta(days=1)
             tomorrow_path = ensure_daily_file(tomorrow_date)
-            tomorrow_text = tomorrow_path.read_text(encoding="utf-8")
-            existing_tasks = _extract_section_body(tomorrow_text, "Today's Tasks")
-            merged_tasks = _merge_task_body(existing_tasks, tomorrow_tasks)
-            tomorrow_text = replace_or_append_section(tomorrow_text, "Today's Tasks", merged_tasks)
-            backup_path = safe_write_text(
-                tomorrow_path, tomorrow_text, OBSIDIAN_PATHS.backup_root, OBSIDIAN_PATHS.write_root
+            tomorrow_text = read_cached(tomorrow_path)
+            merged_text = _extract_and_replace_section(
+                tomorrow_text, "Today's Tasks", lambda body: _merge_task_body(body, tomorrow_tasks)
             )
-            if backup_path:
-                print(f"[backup] {backup_path}")
+            # 任务全是已有条目时合并是原样返回，别再走一遍备份+写盘
+            if merged_text != tomorrow_text:
+                backup_path = safe_write_text(
+                    tomorrow_path, merged_text, OBSIDIAN_PATHS.backup_root, OBSIDIAN_PATHS.write_root
+                )
+                _remember_written(tomorrow_path, merged_text)
+                if backup_path:
+                    logger.info("backup %s", backup_path)
 
         if record_date.weekday() == 6:
             week_date = record_date + dt.timedelta(days=1)
             week_path = ensure_weekly_file(week_date)
             if week_path:
                 weekly_plan = build_weekly_plan(graph, weekly_plan)
-                week_text = week_path.read_text(encoding="utf-8")
-                week_text = render_template(week_text, week_date)
+                original_week_text = read_cached(week_path)
+                week_text = original_week_text
+                # ensure_weekly_file 建档时已渲染过模板；只有还残留 Templater
+                # 令牌（<% ... %>）时才需要再跑一遍替换
+                if "<%" in week_text:
+                    week_text = render_template(week_text, week_date)
                 week_text = _upsert_weekly_tasks_section(week_text, weekly_plan)
-                _, _, week_write_root = _get_week_paths()
-                backup_path = safe_write_text(
-                    week_path,
-                    week_text,
-                    OBSIDIAN_PATHS.backup_root,
-                    week_write_root or week_path.parent,
-                )
-                if backup_path:
-                    print(f"[backup] {backup_path}")
-
-    backup_path = safe_write_text(path, text, OBSIDIAN_PATHS.backup_root, OBSIDIAN_PATHS.write_root)
-    if backup_path:
-        print(f"[backup] {backup_path}")
+                if week_text != original_week_text:
+                    _, _, week_write_root = _get_week_paths()
+                    backup_path = safe_write_text(
+                        week_path,
+                        week_text,
+                        OBSIDIAN_PATHS.backup_root,
+                        week_write_root or week_path.parent,
+                    )
+                    _remember_written(week_path, week_text)
+                    if backup_path:
+                        logger.info("backup %s", backup_path)
+
+    session.flush()
+
+
+def _read_goal_file(path: Path) -> str:
+    """--goal-file 的 mtime 守护缓存，cron/快捷键一天多次调用时免重复读取。
+
+    缓存文件放 backup_root/goal_cache 下、按路径哈希命名；首行记
+    st_mtime_ns 和 st_size，匹配就直接还正文，失配或缓存损坏则回源重建。
+    """
+    st = path.stat()
+    digest = hashlib.blake2b(str(path).encode("utf-8"), digest_size=8).hexdigest()
+    cache_path = OBSIDIAN_PATHS.backup_root / "goal_cache" / f"{digest}.txt"
+    header = f"{st.st_mtime_ns} {st.st_size}\n".encode("ascii")
+    try:
+        raw = cache_path.read_bytes()
+        if raw.startswith(header):
+            return raw[len(header) :].decode("utf-8")
+    except OSError:
+        pass
+    text = path.read_text(encoding="utf-8")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_bytes(header + text.encode("utf-8"))
+    except OSError:
+        pass
+    return text
 
 
 def parse_args(argv: List[str]) -> argparse.Namespace:
@@ -800,11 +1031,13 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
 
 
 def main(argv: List[str]) -> int:
+    # 日志走带缓冲的 logging 而不是逐条 print，脚本化调用也好静音
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
     args = parse_args(argv)
     date = dt.date.fromisoformat(args.date) if args.date else dt.date.today()
     daily_path = ensure_daily_file(date)
 
-    goal_text = args.goal_file.read_text(encoding="utf-8") if args.goal_file and args.goal_file.exists() else None
+    goal_text = _read_goal_file(args.goal_file) if args.goal_file and args.goal_file.exists() else None
     images = [p for p in args.images or [] if p.exists()]
 
     if args.morning:
@@ -10,10 +10,6 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
-from core import goal_manager, llm_analyzer, state_analytics, state_recorder
-from integrations.config import get_config
-
-
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Debug morning prompt locally.")
     parser.add_argument("--date", type=str, help="Morning date (YYYY-MM-DD), default today")
@@ -29,14 +25,17 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> int:
     args = parse_args()
+    # 重模块（LLM 客户端等）推迟到参数解析之后，--help 不用等整条导入链
+    from core import goal_cache, llm_analyzer, state_analytics, state_recorder
+    from integrations.config import get_config
+
     date = dt.date.fromisoformat(args.date) if args.date else dt.date.today()
     if args.state_date:
         state_date = dt.date.fromisoformat(args.state_date)
     else:
         state_date = date - dt.timedelta(days=1)
 
-    graph = goal_manager.build_goal_graph()
-    goal_manager.save_goal_graph(graph)
+    graph = goal_cache.load_or_build()
     state = state_recorder.load_daily_state(state_date)
     trends = state_analytics.summarize_multi_windows(state_date)
 
@@ -61,12 +60,15 @@ def main() -> int:
         prompt_path = Path(str(cfg.get("morning_prompt_path", ""))).expanduser()
         prompt_template = llm_analyzer._load_prompt(prompt_path)
 
+    # 摘要和它的 JSON 串只算一遍：预览和正式请求共用
+    goal_context = llm_analyzer.prepare_goal_graph_context(graph)
+
     if prompt_template:
         variables = {
             "date": date.isoformat(),
             "state_summary": llm_analyzer._json_dump(state or {}),
             "trend_summary": llm_analyzer._json_dump(trends),
-            "goal_graph": llm_analyzer._json_dump(llm_analyzer._extract_goal_summary(graph)),
+            "goal_graph": goal_context[1],
             "progress_summary": "",
             "user_input": llm_analyzer._json_dump(inputs),
         }
@@ -91,6 +93,7 @@ def main() -> int:
         provider_override=args.provider,
         model_override=args.model,
         results_dir_override=output_dir if output_dir else None,
+        goal_context=goal_context,
     )
 
     if not result:
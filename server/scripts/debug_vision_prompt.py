@@ -3,8 +3,11 @@ from __future__ import annotations
 
 import argparse
 import base64
+import concurrent.futures
 import datetime as dt
+import hashlib
 import json
+import shutil
 import sys
 from pathlib import Path
 from typing import List, Optional
@@ -13,23 +16,75 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
-import chat_bot
-from core import state_recorder
-from integrations.config import get_config
-from integrations import llm_client
+try:
+    # SIMD base64（aklomp 内核），多 MB 截图编码比 stdlib 快数倍；未安装退回 stdlib
+    import pybase64  # type: ignore
+except ImportError:  # pragma: no cover
+    pybase64 = None  # type: ignore
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+def _loads_json(text: str) -> dict:
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def _dumps_json(payload: dict) -> bytes:
+    # orjson 原生 UTF-8 不做 \uXXXX 转义；退回 stdlib 时保持同样输出
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
 
 
 def _load_prompt(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
+def _encode_b64(data: bytes) -> str:
+    if pybase64 is not None:
+        # b64encode_as_string 直接产出 str，省掉 bytes→str 的一次拷贝
+        return pybase64.b64encode_as_string(data)
+    return base64.b64encode(data).decode("ascii")
+
+
+def _data_url(path: Path) -> str:
+    return f"data:image/jpeg;base64,{_encode_b64(path.read_bytes())}"
+
+
 def _data_urls_from_files(paths: List[Path]) -> List[str]:
-    urls = []
-    for path in paths:
-        data = path.read_bytes()
-        b64 = base64.b64encode(data).decode("ascii")
-        urls.append(f"data:image/jpeg;base64,{b64}")
-    return urls
+    if len(paths) <= 1:
+        return [_data_url(path) for path in paths]
+    # read_bytes 和 base64 C 扩展都释放 GIL，多张截图时读盘和编码能真正并行
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(paths))) as pool:
+        return list(pool.map(_data_url, paths))
+
+
+def _sha256_of(path: Path) -> str:
+    with open(path, "rb") as fp:
+        if hasattr(hashlib, "file_digest"):  # Py3.11+，C 层分块读
+            return hashlib.file_digest(fp, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+def _image_refs(images: List[Path], result_dir: Path, ts: str) -> List[dict]:
+    """结果 JSON 只存图片引用（sha256+路径），原图拷进旁路目录。
+
+    之前把整条 base64 data URL 塞进 JSON：N 张图要在内存里再膨胀一轮
+    转义串，dumps 也跟着慢；存引用后结果文件回到 KB 级。"""
+    image_dir = result_dir / f"vision_{ts}_images"
+    refs = []
+    for path in images:
+        image_dir.mkdir(parents=True, exist_ok=True)
+        copied = image_dir / path.name
+        shutil.copy2(path, copied)
+        refs.append({"sha256": _sha256_of(path), "path": str(copied), "source": str(path)})
+    return refs
 
 
 def _save_vision_result(
@@ -38,8 +93,9 @@ def _save_vision_result(
     capture_date: dt.date,
     prompt: str,
     prompt_path: Optional[Path],
-    result_text: str,
-    images: List[str],
+    result_raw: str,
+    result_parsed: Optional[dict],
+    images: List[Path],
     result_dir: Path,
 ) -> Path:
     result_dir.mkdir(parents=True, exist_ok=True)
@@ -55,15 +111,11 @@ def _save_vision_result(
         "prompt_path": str(prompt_path) if prompt_path else None,
         "prompt_version": prompt_path.stem if prompt_path else None,
         "prompt_source": "override" if prompt_path else "config",
-        "images": images,
-        "result": None,
-        "raw": result_text,
+        "images": _image_refs(images, result_dir, ts),
+        "result": result_parsed,
+        "raw": result_raw,
     }
-    try:
-        payload["result"] = json.loads(result_text)
-    except Exception:
-        payload["result"] = None
-    path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
+    path.write_bytes(_dumps_json(payload))
     return path
 
 
@@ -73,7 +125,7 @@ def _save_debug_state(state: dict, state_dir: Path) -> Path:
     if not date_str:
         raise ValueError("state.date is required")
     path = state_dir / f"{date_str}.json"
-    path.write_text(json.dumps(state, ensure_ascii=True, indent=2), encoding="utf-8")
+    path.write_bytes(_dumps_json(state))
     return path
 
 
@@ -88,7 +140,7 @@ def parse_args() -> argparse.Namespace:
         choices=["doubao", "openai", "openrouter"],
         help="Provider name",
     )
-    parser.add_argument("--model", type=str, default=chat_bot.DEFAULT_VISION_MODEL, help="Vision model")
+    parser.add_argument("--model", type=str, help="Vision model (default: chat_bot.DEFAULT_VISION_MODEL)")
     parser.add_argument("--prompt", type=Path, help="Prompt file path override")
     parser.add_argument("--update-state", action="store_true", help="Save normalized state JSON")
     parser.add_argument("--output-dir", type=Path, help="Vision debug output dir override")
@@ -98,6 +150,13 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> int:
     args = parse_args()
+    # 重模块（LLM 客户端等）推迟到参数解析之后，--help 不用等整条导入链
+    import chat_bot
+    from core import state_recorder
+    from integrations.config import get_config
+    from integrations import llm_client
+
+    model = args.model or chat_bot.DEFAULT_VISION_MODEL
     capture_date = dt.date.fromisoformat(args.date) if args.date else dt.date.today() - dt.timedelta(days=1)
     images = [p for p in args.images if p.exists()]
     if not images:
@@ -109,7 +168,12 @@ def main() -> int:
 
     client = llm_client.make_client(args.provider)
     data_urls = _data_urls_from_files(images)
-    result_text = chat_bot.vision_describe_multi(client, args.model, data_urls, prompt)
+    result_text = chat_bot.vision_describe_multi(client, model, data_urls, prompt)
+    # 只解析一次：落盘和 --update-state 共用同一棵解析树
+    try:
+        result_parsed: Optional[dict] = _loads_json(result_text)
+    except Exception:
+        result_parsed = None
 
     result_dir = args.output_dir or Path(str(cfg.get("debug_vision_results_dir", ""))).expanduser()
     if not result_dir:
@@ -117,19 +181,21 @@ def main() -> int:
 
     saved = _save_vision_result(
         provider=args.provider,
-        model=args.model,
+        model=model,
         capture_date=capture_date,
         prompt=prompt,
         prompt_path=prompt_path if prompt_path and prompt_path.exists() else None,
-        result_text=result_text,
-        images=data_urls,
+        result_raw=result_text,
+        result_parsed=result_parsed,
+        images=images,
         result_dir=result_dir,
     )
     print(f"Saved vision result: {saved}")
 
     if args.update_state:
-        result_data = json.loads(result_text)
-        state = state_recorder.build_daily_state(capture_date, vision_result=result_data)
+        if result_parsed is None:
+            raise SystemExit("Vision result is not valid JSON; cannot update state.")
+        state = state_recorder.build_daily_state(capture_date, vision_result=result_parsed)
         state_dir = args.state_dir or Path(str(cfg.get("debug_state_dir", ""))).expanduser()
         if not state_dir:
             raise SystemExit("debug_state_dir is not configured")
@@ -13,12 +13,15 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from integrations.config import get_config  # noqa: E402
-from integrations.obsidian import render_template, safe_write_text  # noqa: E402
+from integrations.obsidian import render_template, safe_write_text_batch  # noqa: E402
 
 
 WEEK_RE = re.compile(r"^(?P<year>\d{4})-W(?P<week>\d{1,2})$")
 PADDED_WEEK_RE = re.compile(r"^(?P<year>\d{4})-W0(?P<week>\d{1,2})$")
 
+# week:/journal-week: 两行合成一条交替式，模块级编译一次、整篇只扫一遍
+_FM_WEEK_LINE_RE = re.compile(r"^(week|journal-week):[ \t]*.*$", re.MULTILINE)
+
 
 def _parse_week_id(stem: str) -> Optional[Tuple[int, int]]:
     match = WEEK_RE.match(stem)
@@ -31,7 +34,8 @@ def _parse_week_id(stem: str) -> Optional[Tuple[int, int]]:
 
 
 def _normalize_week_id(year: int, week: int) -> str:
-    return f"{year}-W{week}"
+    # 与 manage_day.ensure_weekly_file 的命名保持一致：补零为规范形式
+    return f"{year}-W{week:02d}"
 
 
 def _canonical_map(paths: List[Path]) -> Dict[str, Dict[str, Union[List[Path], Path, None]]]:
@@ -57,11 +61,14 @@ def _canonical_map(paths: List[Path]) -> Dict[str, Dict[str, Union[List[Path], P
 
 
 def _update_frontmatter_week(text: str, week_id: str) -> str:
-    updated = re.sub(r"^week:\s*.*$", f"week: {week_id}", text, flags=re.MULTILINE)
-    updated = re.sub(
-        r"^journal-week:\s*.*$", f"journal-week: {week_id}", updated, flags=re.MULTILINE
-    )
-    return updated
+    # week:/journal-week: 只会出现在 frontmatter 里，替换限定在头几十行，
+    # 不再让正则扫过整篇正文；没有 frontmatter 时保持旧的全文替换
+    if text.startswith("---\n"):
+        fm, sep, body = text[4:].partition("\n---\n")
+        if sep:
+            fm = _FM_WEEK_LINE_RE.sub(lambda m: f"{m.group(1)}: {week_id}", fm)
+            return f"---\n{fm}{sep}{body}"
+    return _FM_WEEK_LINE_RE.sub(lambda m: f"{m.group(1)}: {week_id}", text)
 
 
 def _iso_week_start(year: int, week: int) -> dt.date:
@@ -86,6 +93,8 @@ def main() -> int:
     write_root = Path(str(cfg.get("week_write_root", week_root))).expanduser()
 
     paths = sorted(week_root.glob("*.md"))
+    # glob 已经拿到全部文件名，改名冲突用集合判断，省掉逐个 exists() 的 stat
+    existing_names = {p.name for p in paths}
     mapping = _canonical_map(paths)
     if not mapping:
         print("No weekly notes found.")
@@ -93,6 +102,7 @@ def main() -> int:
 
     total_updates = 0
     total_renames = 0
+    pending_writes: List[Tuple[Path, str]] = []
     for week_id, entry in mapping.items():
         canonical = entry["canonical"]
         if not isinstance(canonical, Path):
@@ -103,7 +113,7 @@ def main() -> int:
 
         desired_path = canonical.with_name(f"{week_id}.md")
         rename_needed = canonical != desired_path
-        if rename_needed and desired_path.exists() and desired_path != canonical:
+        if rename_needed and desired_path.name in existing_names:
             print(f"[skip] {canonical.name} -> {desired_path.name} (target exists)")
             rename_needed = False
 
@@ -119,6 +129,8 @@ def main() -> int:
 
         if rename_needed:
             print(f"[rename] {canonical.name} -> {desired_path.name}")
+            existing_names.discard(canonical.name)
+            existing_names.add(desired_path.name)
             if args.apply:
                 canonical.rename(desired_path)
                 canonical = desired_path
@@ -127,9 +139,13 @@ def main() -> int:
         if rendered != text:
             print(f"[update] {canonical.name}")
             if args.apply:
-                safe_write_text(canonical, rendered, backup_root, write_root)
+                pending_writes.append((canonical, rendered))
             total_updates += 1
 
+    if pending_writes:
+        # 攒到最后一次批量落盘：fsync 屏障按目录合并，而不是每篇一次
+        safe_write_text_batch(pending_writes, backup_root, write_root)
+
     if not args.apply:
         print("Dry run complete. Use --apply to write changes.")
     print(f"Renames: {total_renames}, Updates: {total_updates}")
@@ -10,6 +10,11 @@ from pathlib import Path
 import manage_day
 from core import state_recorder
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
 
 def _parse_iso_date(value: str | None) -> dt.date | None:
     if not value:
@@ -39,7 +44,9 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
 
 def main(argv: list[str]) -> int:
     args = parse_args(argv)
-    payload = json.loads(args.file.read_text(encoding="utf-8"))
+    # 直接喂 bytes：省掉 read_text 的整串解码；orjson 在位则再快一截
+    raw = args.file.read_bytes()
+    payload = orjson.loads(raw) if orjson is not None else json.loads(raw)
     target_date = _infer_date(payload, args.date)
 
     state = state_recorder.build_daily_state_from_garmin(target_date, payload)
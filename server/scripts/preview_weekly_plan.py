@@ -11,7 +11,7 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 import manage_day
-from core import goal_manager
+from core import goal_cache
 
 
 def parse_args() -> argparse.Namespace:
@@ -29,8 +29,7 @@ def parse_args() -> argparse.Namespace:
 def main() -> int:
     args = parse_args()
     date = dt.date.fromisoformat(args.date) if args.date else dt.date.today()
-    graph = goal_manager.build_goal_graph()
-    goal_manager.save_goal_graph(graph)
+    graph = goal_cache.load_or_build()
     plan = manage_day.build_weekly_plan(graph)
     tasks_body = manage_day.render_weekly_tasks(plan).rstrip()
     iso = date.isocalendar()